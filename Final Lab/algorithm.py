@@ -1,9 +1,27 @@
 """
 File: algorithm.py
 Graph-processing algorithms
+
+The algorithms keep their working state (distances, predecessors and
+visited flags) in lists indexed by the graph's dense vertex ids, and only
+translate ids back to labels when they return their results.
+
+Each algorithm also accepts a FrozenGraph (see LinkedDirectedGraph.freeze()),
+in which case it scans the snapshot's flat arrays by vertex id instead of
+walking the linked edge lists.
 """
+import heapq
+import os
+from collections import deque
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from linkedstack import LinkedStack
 from minheap import MinHeap
+from indexedheap import IndexedMinHeap
+from frozengraph import FrozenGraph
+from shortestpathtree import ShortestPathTree
+from disjointset import DisjointSet
 
 def topoSort(g, startLabel = None):
     """
@@ -15,22 +33,52 @@ def topoSort(g, startLabel = None):
     The function returns the topological order of the vertices
     
     """
+    if isinstance(g, FrozenGraph):
+        return _topoSortFrozen(g)
+    # Depth-first search, pushing each vertex when it is finished
     stack = LinkedStack()
-    g.clearVertexMarks()
-    for v in g.getVertices():
-        if not v.isMarked():
-            dfs(g, v, stack)
+    g.traverse(postorder = stack.push)
     return stack
 
-def dfs(g, v, stack):
+def topoLayers(g, startLabel = None):
     """
-    A helper function : Depth-first search
+    Input:
+        A DAG object (LinkedDirectedGraph or FrozenGraph)
+    Output:
+        The topological layers of the vertices (list of sets of labels)
+        e.g, [{"A", "B"}, {"C"}, {"D", "E"}]
+
+    The function returns the vertices in layers: the first layer holds the
+    vertices with no incoming edges, and each later layer holds the vertices
+    whose predecessors are all in earlier layers, so the vertices of a layer
+    do not depend on each other. It uses Kahn's algorithm, repeatedly
+    removing the vertices whose in-degree has dropped to zero.
+    Raises: ValueError if the graph has a cycle, in which case some
+    vertices never reach in-degree zero.
     """
-    v.setMark()
-    for w in g.neighboringVertices(v.getLabel()):
-        if not w.isMarked():
-            dfs(g, w, stack)
-    stack.push(v)
+    n = g.sizeVertices()
+    inDegrees = [0] * n
+    for v in range(n):
+        for w, weight, edge in _arcs(g, v):
+            inDegrees[w] += 1
+
+    layers = []
+    layer = [v for v in range(n) if inDegrees[v] == 0]
+    placed = 0
+    while layer:
+        placed += len(layer)
+        layers.append({_vertexLabel(g, v) for v in layer})
+        nextLayer = []
+        for v in layer:
+            for w, weight, edge in _arcs(g, v):
+                inDegrees[w] -= 1
+                if inDegrees[w] == 0:
+                    nextLayer.append(w)
+        layer = nextLayer
+
+    if placed < n:
+        raise ValueError("Invalid graph! The graph must be a DAG")
+    return layers
 
 def spanTree(g, startLabel):
     """
@@ -43,13 +91,17 @@ def spanTree(g, startLabel):
     Works on undirected connected graph.
     
     """
+    if isinstance(g, FrozenGraph):
+        return _spanTreeFrozen(g, startLabel)
     
-    # mark all vertices as unvisited
-    visited_vertices = set()
+    # mark all vertices as unvisited; the flags are indexed by vertex id
+    visited_vertices = bytearray(g.sizeVertices())
+    visited_count = 0
     
     # mark some vertex, say v, as visited
     start_vertex = g.getVertex(startLabel)
-    visited_vertices.add(start_vertex)
+    visited_vertices[start_vertex.id] = 1
+    visited_count += 1
     
     # Instantiate a min-heap priority queue
     pq = MinHeap()
@@ -63,7 +115,7 @@ def spanTree(g, startLabel):
     result = []
     
     # while k < number of vertices:
-    while len(visited_vertices) < g.sizeVertices() and not pq.isEmpty():
+    while visited_count < g.sizeVertices() and not pq.isEmpty():
         # pop an edge from the heap
         minWeight_edge = pq.pop()
         # the other end of the edge
@@ -71,59 +123,108 @@ def spanTree(g, startLabel):
         to_v = minWeight_edge.getToVertex()
         
         # Determine which vertex is the new one
-        if from_v in visited_vertices and to_v not in visited_vertices:
+        if visited_vertices[from_v.id] and not visited_vertices[to_v.id]:
             new_vertex = to_v
-        elif to_v in visited_vertices and from_v not in visited_vertices:
+        elif visited_vertices[to_v.id] and not visited_vertices[from_v.id]:
             new_vertex = from_v
         else:
             continue  # skip if both ends are visited or both unvisited
             
-        visited_vertices.add(new_vertex)
+        visited_vertices[new_vertex.id] = 1
+        visited_count += 1
         result.append(minWeight_edge)
         
         # Add new edges from this vertex
         for leading_edge in new_vertex.incidentEdges():
             other = leading_edge.getOtherVertex(new_vertex)
-            if other not in visited_vertices:
+            if not visited_vertices[other.id]:
                 pq.add(leading_edge)
     return result
             
-def repairQueue(g, startLabel = None):
+def spanForest(g, startLabel = None):
+    """
+    Input:
+        A graph object (LinkedDirectedGraph or FrozenGraph)
+    Output:
+        A list of edges (list)
+
+    The function returns a minimum spanning forest: for each connected
+    component, the edges that connect its vertices with minimum total weight.
+    It uses Kruskal's algorithm, sorting the edges once and joining
+    components with a union-find structure, so unlike spanTree it also works
+    on disconnected graphs. A mirrored pair of directed edges counts as one
+    undirected edge, with the weight of the cheaper of the two.
+    """
+    connections, symmetric = _spanConnections(g)
+    return _kruskal(g, connections)
+
+# The fraction of all possible vertex pairs that must be joined by edges
+# before Prim's algorithm is used instead of Kruskal's: sorting the edge
+# list once is cheaper than Prim's heap operations except on nearly
+# complete graphs
+DENSE_GRAPH_FRACTION = 0.5
+
+def bestSpanTree(g, startLabel = None):
+    """
+    Input:
+        A graph object and optionally the start vertex
+        (LinkedDirectedGraph or FrozenGraph, string)
+    Output:
+        A list of edges (list)
+
+    The function returns a minimum spanning forest, using Prim's algorithm
+    (spanTree) for dense connected graphs and Kruskal's algorithm
+    (spanForest) otherwise. Prim's algorithm follows edges only in their
+    own direction, so it is used only if every edge has a mirror of the
+    same weight.
+    """
+    if g.sizeVertices() == 0:
+        return []
+    n = g.sizeVertices()
+    connections, symmetric = _spanConnections(g)
+    if symmetric and len(connections) >= DENSE_GRAPH_FRACTION * n * (n - 1) / 2:
+        if startLabel is None:
+            startLabel = _vertexLabel(g, 0)
+        result = spanTree(g, startLabel)
+        # Prim's algorithm only spans the start vertex's component
+        if len(result) == n - 1:
+            return result
+    return _kruskal(g, connections)
+
+def repairQueue(g, startLabel = None, k = None):
     """
     Input:
-        A graph object (LinkedDirectedGraph)
+        A graph object and optionally the number of repairs wanted
+        (LinkedDirectedGraph or FrozenGraph, int)
     Output:
         A list of undirected edges (list)
         e.g, [(1, ("A", "B")), (2, ("B", "C")), (3, ("C", "D"))]
         
     The function returns all unique undirected edges in the graph, sorted by weight.
+    If k is given, only the k most urgent edges are returned; they are selected
+    with a heap of at most k entries, in O(E log k) time and O(k) extra space.
     
     """
-    # mark all edges as unvisited
-    visited_edges = set()
-    
-    # min-heap priority queue
-    pq = MinHeap()
-    
-    # Add each edge into the min-heap priority queue
-    for edge in g.edges():
-        
-        from_v = edge.getFromVertex()
-        to_v = edge.getToVertex()
-        key = tuple(sorted((from_v.getLabel(), to_v.getLabel()))) # works for undirected edged to avoid duplicate addition
-        
-        if key not in visited_edges:
-            pq.add((edge.getWeight(),key))
-            visited_edges.add(key)
-    
-    # Pop the items from priority queue and add them to list
-    result = []
-    while not pq.isEmpty():
-        edge = pq.pop()
-        result.append(edge)
-    
-    return result
-    
+    if k is None:
+        return sorted(_repairEntries(g))
+    return heapq.nsmallest(k, _repairEntries(g))
+
+def repairStream(g, startLabel = None):
+    """
+    Input:
+        A graph object (LinkedDirectedGraph or FrozenGraph)
+    Output:
+        A generator of undirected edges, e.g. (1, ("A", "B"))
+
+    The function yields the unique undirected edges in the graph lazily,
+    in the same order as repairQueue. The heap is built in linear time and
+    each edge is popped only when it is asked for, so taking the first few
+    edges costs O(E + k log E) rather than a full sort.
+    """
+    pq = list(_repairEntries(g))
+    heapq.heapify(pq)
+    while pq:
+        yield heapq.heappop(pq)
 
 def shortestPaths(g, startLabel):
     """
@@ -137,38 +238,573 @@ def shortestPaths(g, startLabel):
         }
 
     This function using Dijkstra's algorithm to find the shortest paths from a given start vertex on the graph.
+    The weights must not be negative; if some are, the search still ends,
+    but the costs may not be the shortest (see johnsonAllPairs).
     """
+    if isinstance(g, FrozenGraph):
+        return _shortestPathsFrozen(g, startLabel)
 
-    distances = {v.getLabel(): float("inf") for v in g.getVertices()}
-    distances[startLabel] = 0
+    # The working state is indexed by vertex id
+    start = g.getVertex(startLabel).id
+    distances = [float("inf")] * g.sizeVertices()
+    distances[start] = 0
 
-    predecessors = {}
+    # predecessors holds the edge used to reach each vertex,
+    # and reached the vertices in the order they were first reached
+    predecessors = [None] * g.sizeVertices()
+    reached = []
 
-    visited = set()
-
-    heap = MinHeap()
-    heap.add((0, startLabel))
+    # Each vertex is in the heap at most once; a shorter path
+    # decreases its key instead of adding another entry
+    heap = IndexedMinHeap()
+    heap.add(start, 0)
+    # A settled vertex is never reached again, even through a negative
+    # edge, so the search ends on every graph
+    settled = bytearray(g.sizeVertices())
 
     while not heap.isEmpty():
-        current_dist, current_label = heap.pop()
-
-        if current_label in visited:
-            continue
-        visited.add(current_label)
+        current, current_dist = heap.pop()
+        settled[current] = 1
 
-        for edge in g.incidentEdges(current_label):
-            neighbor = edge.getToVertex().getLabel()
+        current_vertex = g.getVertexById(current)
+        for edge in current_vertex.incidentEdges():
+            # The other vertex, as the edge may be an undirected one
+            # shared with the neighbor
+            neighbor = edge.getOtherVertex(current_vertex).id
+            if settled[neighbor]:
+                continue
             weight = edge.getWeight()
             new_dist = current_dist + weight
             if new_dist < distances[neighbor]:
+                if predecessors[neighbor] is None:
+                    reached.append(neighbor)
                 distances[neighbor] = new_dist
                 predecessors[neighbor] = edge
-                heap.add((new_dist, neighbor))
+                if neighbor in heap:
+                    heap.decreaseKey(neighbor, new_dist)
+                else:
+                    heap.add(neighbor, new_dist)
+
+    return {
+        g.getVertexById(v).getLabel(): {
+            "edge": predecessors[v],
+            "cost": distances[v]
+        }
+        for v in reached
+    }
+
+
+def shortestPath(g, source, target, heuristic = None):
+    """
+    Input:
+        A graph object, the labels of the source and target vertices
+        (LinkedDirectedGraph or FrozenGraph, string, string), and optionally
+        a heuristic function
+    Output:
+        A dictionary
+        {
+        "path": list of the edges from source to target, in order
+        "cost": total distance from source to target
+        }
+        or None if target cannot be reached from source
+
+    This function uses Dijkstra's algorithm from source and stops as soon as
+    target is settled, so it only explores the part of the graph closer to
+    source than target. If heuristic is given it runs A* instead:
+    heuristic(label) must return a lower bound on the distance from the
+    vertex with label to target, and must be consistent: it may not drop
+    by more than the weight of any edge. A settled vertex is never
+    reopened, so the search ends even if some weights are negative.
+    """
+    start = _vertexId(g, source)
+    goal = _vertexId(g, target)
+
+    # The working state is kept in dictionaries keyed by vertex id, so a
+    # search that settles few vertices does not pay for the whole graph
+    distances = {start: 0}
+    parents = {}
+    parent_edges = {}
+
+    def estimate(v):
+        if heuristic is None:
+            return 0
+        return heuristic(_vertexLabel(g, v))
+
+    heap = IndexedMinHeap()
+    heap.add(start, estimate(start))
+    settled = set()
+
+    while not heap.isEmpty():
+        current = heap.pop()[0]
+        if current == goal:
+            break
+        settled.add(current)
+        current_dist = distances[current]
+        for neighbor, weight, edge in _arcs(g, current):
+            if neighbor in settled:
+                continue
+            new_dist = current_dist + weight
+            if new_dist < distances.get(neighbor, float("inf")):
+                distances[neighbor] = new_dist
+                parents[neighbor] = current
+                parent_edges[neighbor] = edge
+                if neighbor in heap:
+                    heap.decreaseKey(neighbor, new_dist + estimate(neighbor))
+                else:
+                    heap.add(neighbor, new_dist + estimate(neighbor))
+    else:
+        # The heap ran out before target was settled
+        return None
+
+    return {"path": _pathTo(goal, parents, parent_edges),
+            "cost": distances[goal]}
+
+def bidirectionalShortestPath(g, source, target):
+    """
+    Input:
+        A graph object and the labels of the source and target vertices
+        (LinkedDirectedGraph, string, string)
+    Output:
+        The same as shortestPath: a dictionary with the "path" (list of edges)
+        and "cost" from source to target, or None if target cannot be reached
+
+    This function runs Dijkstra's algorithm forward from source over the
+    incident edges and backward from target over the incoming edges, always
+    advancing the search whose next vertex is closer. It stops when the sum
+    of the two searches' smallest keys is no less than the best path found
+    through a vertex reached by both, so on long routes it settles far fewer
+    vertices than a search from source alone.
+    Precondition: g is a LinkedDirectedGraph or LinkedUndirectedGraph,
+    which index their incoming edges; a FrozenGraph does not.
+    """
+    if isinstance(g, FrozenGraph):
+        raise ValueError("A FrozenGraph has no incoming edge index")
+    start = g.getVertex(source).id
+    goal = g.getVertex(target).id
+    if start == goal:
+        return {"path": [], "cost": 0}
+
+    # Index 0 holds the forward search and index 1 the backward search
+    distances = ({start: 0}, {goal: 0})
+    parents = ({}, {})
+    parent_edges = ({}, {})
+    heaps = (IndexedMinHeap(), IndexedMinHeap())
+    heaps[0].add(start, 0)
+    heaps[1].add(goal, 0)
+    arcs = (_arcs, _incomingArcs)
+    # A settled vertex is never reached again by its search, so the
+    # searches end even if some weights are negative
+    settled = (set(), set())
+
+    best = float("inf")
+    meeting = None
+    while not heaps[0].isEmpty() and not heaps[1].isEmpty():
+        forward_key = heaps[0].peek()[1]
+        backward_key = heaps[1].peek()[1]
+        if forward_key + backward_key >= best:
+            break
+        side = 0 if forward_key <= backward_key else 1
+        current, current_dist = heaps[side].pop()
+        settled[side].add(current)
+        dist, other_dist = distances[side], distances[1 - side]
+        for neighbor, weight, edge in arcs[side](g, current):
+            if neighbor in settled[side]:
+                continue
+            new_dist = current_dist + weight
+            if new_dist < dist.get(neighbor, float("inf")):
+                dist[neighbor] = new_dist
+                parents[side][neighbor] = current
+                parent_edges[side][neighbor] = edge
+                if neighbor in heaps[side]:
+                    heaps[side].decreaseKey(neighbor, new_dist)
+                else:
+                    heaps[side].add(neighbor, new_dist)
+            if neighbor in other_dist and \
+               dist[neighbor] + other_dist[neighbor] < best:
+                best = dist[neighbor] + other_dist[neighbor]
+                meeting = neighbor
+
+    if meeting is None:
+        return None
+    # The backward parents lead from the meeting vertex toward target
+    path = _pathTo(meeting, parents[0], parent_edges[0])
+    v = meeting
+    while v in parents[1]:
+        path.append(parent_edges[1][v])
+        v = parents[1][v]
+    return {"path": path, "cost": best}
+
+def shortestPathsMany(g, startLabels, workers = None):
+    """
+    Input:
+        A graph object, the start vertices and optionally the number of
+        worker processes (LinkedDirectedGraph or FrozenGraph, iterable of
+        strings, int)
+    Output:
+        A list with a ShortestPathTree for each start vertex, in the order
+        of startLabels: a read-only mapping with the same contents as the
+        result of shortestPaths
+
+    The function runs Dijkstra's algorithm from many start vertices in
+    parallel. The graph is frozen once and its CSR arrays are copied into
+    shared memory, which each worker process attaches to when it starts,
+    so the graph is not pickled for every start vertex; a task only carries
+    a vertex id and returns its reached vertices, costs and edge slots as
+    flat arrays, which pickle as raw bytes. Each tree keeps those arrays
+    and builds an entry only when it is read, so this process does no work
+    per reached vertex.
+    workers defaults to the number of CPUs. With one worker or one start
+    vertex the searches run in this process.
+    Weights are stored as 64-bit integers if they are all integers, or as
+    floats otherwise.
+    """
+    frozen = g if isinstance(g, FrozenGraph) else g.freeze()
+    starts = [frozen.getId(label) for label in startLabels]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(starts))
+    if workers <= 1:
+        return [ShortestPathTree(frozen, *_compactTree(frozen.offsets, frozen.targets,
+                                                       frozen.weights, len(frozen), start))
+                for start in starts]
+
+    if all(isinstance(weight, int) for weight in frozen.weights):
+        weights = array("q", frozen.weights)
+    else:
+        weights = array("d", frozen.weights)
+    blocks = []
+    try:
+        specs = []
+        for values in (frozen.offsets, frozen.targets, weights):
+            block = shared_memory.SharedMemory(
+                create = True, size = max(1, len(values) * values.itemsize))
+            blocks.append(block)
+            block.buf[:len(values) * values.itemsize] = values.tobytes()
+            specs.append((block.name, values.typecode, len(values)))
+
+        with ProcessPoolExecutor(max_workers = workers,
+                                 initializer = _attachSharedGraph,
+                                 initargs = (specs, len(frozen))) as executor:
+            chunksize = max(1, len(starts) // (workers * 4))
+            trees = list(executor.map(_shortestPathsShared, starts,
+                                      chunksize = chunksize))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return [ShortestPathTree(frozen, reached, costs, slots)
+            for reached, costs, slots in trees]
+
+def johnsonAllPairs(g, startLabel = None):
+    """
+    Input:
+        A graph object (LinkedDirectedGraph or FrozenGraph)
+    Output:
+        A generator of (label, row) pairs, one for each vertex, where row
+        is a dictionary mapping each vertex reachable from it, including
+        itself, to the cost of the shortest path
+
+    The function uses Johnson's algorithm, which suits sparse graphs: the
+    Bellman-Ford algorithm, run once from a virtual vertex with a zero-weight
+    edge to every vertex, finds a potential h for each vertex, and the
+    weight of each edge u -> v is changed to weight + h(u) - h(v), which is
+    never negative. Dijkstra's algorithm then runs from each vertex in turn,
+    and each row is yielded as soon as it is found, so only one row is held
+    at a time. The potentials are skipped if no weight is negative.
+    Raises: ValueError if the graph has a negative cycle.
+    """
+    frozen = g if isinstance(g, FrozenGraph) else g.freeze()
+    n = len(frozen)
+    offsets, targets, weights = frozen.offsets, frozen.targets, frozen.weights
+
+    potentials = [0] * n
+    if any(weight < 0 for weight in weights):
+        potentials = _bellmanFord(frozen)
+        weights = [weights[slot] + potentials[v] - potentials[targets[slot]]
+                   for v in range(n)
+                   for slot in range(offsets[v], offsets[v + 1])]
+
+    for source in range(n):
+        reached, distances, predecessors = _dijkstraSlots(offsets, targets, weights, n, source)
+        row = {frozen.labels[source]: 0}
+        for v in reached:
+            if v != source:
+                row[frozen.labels[v]] = distances[v] - potentials[source] + potentials[v]
+        yield frozen.labels[source], row
+
+def _pathTo(goal, parents, parent_edges):
+    """Returns the list of edges that leads to goal, following
+    the parents back to the vertex that has no parent."""
+    path = []
+    v = goal
+    while v in parents:
+        path.append(parent_edges[v])
+        v = parents[v]
+    path.reverse()
+    return path
+
+# Helpers for algorithms that accept either a LinkedDirectedGraph or a
+# FrozenGraph and work with vertex ids.
+
+def _vertexId(g, label):
+    """Returns the id of the vertex with label."""
+    if isinstance(g, FrozenGraph):
+        return g.getId(label)
+    return g.getVertex(label).id
+
+def _vertexLabel(g, v):
+    """Returns the label of the vertex with id v."""
+    if isinstance(g, FrozenGraph):
+        return g.labels[v]
+    return g.getVertexById(v).getLabel()
+
+def _incomingArcs(g, v):
+    """Supports iteration over (neighbor id, weight, edge) for each
+    edge that enters the vertex with id v of a LinkedDirectedGraph."""
+    vertex = g.getVertexById(v)
+    for edge in g.incomingEdges(vertex.getLabel()):
+        yield edge.getOtherVertex(vertex).id, edge.getWeight(), edge
+
+def _arcs(g, v):
+    """Supports iteration over (neighbor id, weight, edge) for each
+    edge that leaves the vertex with id v."""
+    if isinstance(g, FrozenGraph):
+        for slot in range(g.offsets[v], g.offsets[v + 1]):
+            yield g.targets[slot], g.weights[slot], g.edges[slot]
+    else:
+        vertex = g.getVertexById(v)
+        for edge in vertex.incidentEdges():
+            yield edge.getOtherVertex(vertex).id, edge.getWeight(), edge
+
 
+# Versions of the algorithms for a FrozenGraph. Vertices are ids and edges
+# are slots of the snapshot's flat arrays.
+
+def _topoSortFrozen(g):
+    """topoSort over the CSR arrays of a FrozenGraph. The depth-first
+    search keeps an explicit stack of (vertex, next slot) frames."""
+    offsets, targets = g.offsets, g.targets
+    stack = LinkedStack()
+    marked = bytearray(len(g))
+    for start in range(len(g)):
+        if marked[start]:
+            continue
+        marked[start] = 1
+        frames = [[start, offsets[start]]]
+        while frames:
+            frame = frames[-1]
+            v, slot = frame
+            end = offsets[v + 1]
+            while slot < end and marked[targets[slot]]:
+                slot += 1
+            if slot < end:
+                w = targets[slot]
+                frame[1] = slot + 1
+                marked[w] = 1
+                frames.append([w, offsets[w]])
+            else:
+                frames.pop()
+                stack.push(g.vertices[v])
+    return stack
+
+def _spanTreeFrozen(g, startLabel):
+    """spanTree (Prim's algorithm) over the CSR arrays of a FrozenGraph."""
+    offsets, targets, weights = g.offsets, g.targets, g.weights
+    start = g.getId(startLabel)
+    visited = bytearray(len(g))
+    visited[start] = 1
+    visitedCount = 1
+
+    # The heap holds (weight, slot) pairs; every slot pushed leads
+    # away from a visited vertex
+    pq = MinHeap()
+    for slot in range(offsets[start], offsets[start + 1]):
+        pq.add((weights[slot], slot))
+
+    result = []
+    while visitedCount < len(g) and not pq.isEmpty():
+        weight, slot = pq.pop()
+        new_vertex = targets[slot]
+        if visited[new_vertex]:
+            continue
+        visited[new_vertex] = 1
+        visitedCount += 1
+        result.append(g.edges[slot])
+        for leading_slot in range(offsets[new_vertex], offsets[new_vertex + 1]):
+            if not visited[targets[leading_slot]]:
+                pq.add((weights[leading_slot], leading_slot))
+    return result
+
+def _spanConnections(g):
+    """Returns a list of (weight, vertex id, vertex id, edge) for the
+    edges of the graph, taken as undirected, with each mirrored pair
+    listed once as its cheaper edge, and whether every edge has a mirror
+    of the same weight."""
+    connections = []
+    symmetric = True
+    if not isinstance(g, FrozenGraph):
+        for edge in g.connections():
+            fromVertex, toVertex = edge.getFromVertex(), edge.getToVertex()
+            mirror = toVertex.getEdgeTo(fromVertex)
+            if mirror is None or mirror.getWeight() != edge.getWeight():
+                symmetric = False
+            if mirror is not None and mirror.getWeight() < edge.getWeight():
+                edge = mirror
+            connections.append((edge.getWeight(), fromVertex.id, toVertex.id, edge))
+        return connections, symmetric
+    offsets, targets, weights, edges = g.offsets, g.targets, g.weights, g.edges
+    mirrors = g.mirrors
+    for v in range(len(g)):
+        for slot in range(offsets[v], offsets[v + 1]):
+            w = targets[slot]
+            mirror = mirrors[slot]
+            if mirror < 0 or weights[mirror] != weights[slot]:
+                symmetric = False
+            if v > w and mirror >= 0:
+                continue
+            if mirror >= 0 and weights[mirror] < weights[slot]:
+                slot = mirror
+            connections.append((weights[slot], v, w, edges[slot]))
+    return connections, symmetric
+
+def _kruskal(g, connections):
+    """Kruskal's algorithm over a list of (weight, vertex id, vertex id,
+    edge) connections, which it sorts in place."""
+    connections.sort(key = lambda connection: connection[0])
+    components = DisjointSet(g.sizeVertices())
+    result = []
+    for weight, u, v, edge in connections:
+        if components.union(u, v):
+            result.append(edge)
+            if len(result) == g.sizeVertices() - 1:
+                break
+    return result
+
+def _repairEntries(g):
+    """Yields a (weight, sorted label pair) entry for each edge of the
+    graph, taken as undirected, with each mirrored pair of edges listed
+    once. No set of visited edges is kept: like connections(), an edge is
+    skipped only if it runs from the higher id and its mirror exists."""
+    if not isinstance(g, FrozenGraph):
+        for edge in g.connections():
+            key = tuple(sorted((edge.getFromVertex().getLabel(),
+                                edge.getToVertex().getLabel())))
+            yield (edge.getWeight(), key)
+        return
+    offsets, targets, weights, labels = g.offsets, g.targets, g.weights, g.labels
+    mirrors = g.mirrors
+    for v in range(len(g)):
+        for slot in range(offsets[v], offsets[v + 1]):
+            w = targets[slot]
+            if v <= w or mirrors[slot] < 0:
+                yield (weights[slot], tuple(sorted((labels[v], labels[w]))))
+
+def _shortestPathsFrozen(g, startLabel):
+    """shortestPaths (Dijkstra's algorithm) over the CSR arrays of a FrozenGraph."""
+    reached, distances, predecessors = _dijkstraSlots(
+        g.offsets, g.targets, g.weights, len(g), g.getId(startLabel))
     return {
-        label: {
-            "edge": edge,
-            "cost": distances[label]
+        g.labels[v]: {
+            "edge": g.edges[predecessors[v]],
+            "cost": distances[v]
         }
-        for label, edge in predecessors.items()
-    }
\ No newline at end of file
+        for v in reached
+    }
+
+# The graph shared by shortestPathsMany, attached once in each worker process
+_sharedGraph = None
+
+def _attachSharedGraph(specs, n):
+    """Attaches a worker process to the shared memory blocks of the
+    offsets, targets and weights arrays described by specs."""
+    global _sharedGraph
+    blocks = [shared_memory.SharedMemory(name = name) for name, typecode, length in specs]
+    views = [block.buf[:length * array(typecode).itemsize].cast(typecode)
+             for block, (name, typecode, length) in zip(blocks, specs)]
+    _sharedGraph = (blocks, views, n)
+
+def _shortestPathsShared(start):
+    """Runs Dijkstra's algorithm from start over the shared graph and
+    returns the reached vertices with their costs and edge slots."""
+    blocks, (offsets, targets, weights), n = _sharedGraph
+    return _compactTree(offsets, targets, weights, n, start)
+
+def _compactTree(offsets, targets, weights, n, start):
+    """Runs Dijkstra's algorithm from start and returns the reached
+    vertices, their costs and their edge slots as arrays."""
+    reached, distances, predecessors = _dijkstraSlots(offsets, targets, weights, n, start)
+    costs = [distances[v] for v in reached]
+    typecode = "q" if all(isinstance(cost, int) for cost in costs) else "d"
+    return (array("q", reached),
+            array(typecode, costs),
+            array("q", [predecessors[v] for v in reached]))
+
+def _bellmanFord(g):
+    """Returns the distances in a FrozenGraph from a virtual vertex with a
+    zero-weight edge to every vertex, which are at most 0. Vertices whose
+    distance has dropped wait in a FIFO queue to relax their edges.
+    Raises: ValueError if the graph has a negative cycle."""
+    offsets, targets, weights = g.offsets, g.targets, g.weights
+    n = len(g)
+    distances = [0] * n
+    # Every vertex is first reached from the virtual vertex
+    queue = deque(range(n))
+    queued = bytearray([1]) * n
+    # The number of edges on the path that gives each distance, counting
+    # the edge from the virtual vertex. Without a negative cycle a shortest
+    # path has at most n edges, so a longer one must go round a cycle
+    lengths = [1] * n
+    while queue:
+        v = queue.popleft()
+        queued[v] = 0
+        for slot in range(offsets[v], offsets[v + 1]):
+            w = targets[slot]
+            newDistance = distances[v] + weights[slot]
+            if newDistance < distances[w]:
+                distances[w] = newDistance
+                lengths[w] = lengths[v] + 1
+                if lengths[w] > n:
+                    raise ValueError("The graph has a negative cycle")
+                if not queued[w]:
+                    queued[w] = 1
+                    queue.append(w)
+    return distances
+
+def _dijkstraSlots(offsets, targets, weights, n, start):
+    """Dijkstra's algorithm over CSR arrays of n vertices. Returns the
+    vertices in the order they were first reached, and lists indexed by
+    vertex id of their distances and of the slots of the edges used to
+    reach them."""
+    distances = [float("inf")] * n
+    distances[start] = 0
+
+    # predecessors holds the slot of the edge used to reach each vertex,
+    # and reached the vertices in the order they were first reached
+    predecessors = [-1] * n
+    reached = []
+
+    heap = IndexedMinHeap()
+    heap.add(start, 0)
+    settled = bytearray(n)
+
+    while not heap.isEmpty():
+        current, current_dist = heap.pop()
+        settled[current] = 1
+
+        for slot in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[slot]
+            if settled[neighbor]:
+                continue
+            new_dist = current_dist + weights[slot]
+            if new_dist < distances[neighbor]:
+                if predecessors[neighbor] == -1:
+                    reached.append(neighbor)
+                distances[neighbor] = new_dist
+                predecessors[neighbor] = slot
+                if neighbor in heap:
+                    heap.decreaseKey(neighbor, new_dist)
+                else:
+                    heap.add(neighbor, new_dist)
+
+    return reached, distances, predecessors
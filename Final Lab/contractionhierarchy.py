@@ -0,0 +1,282 @@
+"""
+File: contractionhierarchy.py
+
+A ContractionHierarchy preprocesses a LinkedDirectedGraph so that the cost
+of the shortest path between two vertices can be found by searching only a
+small part of the graph.
+
+The vertices are contracted one at a time, least important first. When a
+vertex is contracted, a shortcut edge is added between each pair of its
+remaining neighbors whose shortest path runs through it, so the distances
+among the remaining vertices are kept. A vertex's rank is the position at
+which it was contracted.
+
+A query searches forward from the source along the edges that lead to
+higher ranks (the upward graph) and backward from the target along the
+edges that come from higher ranks (the downward graph). Every shortest path
+has a version that climbs and then descends, so the two searches meet at
+its highest vertex. Both graphs are stored in CSR arrays like a
+FrozenGraph's, and shortcuts remember the vertex they skip so that paths
+can be unpacked.
+
+The hierarchy is a snapshot: it does not change with the graph, and
+isCurrent() tells whether the graph has changed since it was built.
+"""
+
+import heapq
+import pickle
+from array import array
+from frozengraph import FrozenGraph
+
+class ContractionHierarchy(object):
+    """Represents the contraction hierarchy of a graph."""
+
+    # The number of vertices a witness search may settle before it gives
+    # up, in which case the shortcut is added anyway
+    WITNESS_LIMIT = 500
+
+    def __init__(self, graph):
+        """Contracts the vertices of graph (a LinkedDirectedGraph or a
+        FrozenGraph) and builds the upward and downward graphs."""
+        frozen = graph if isinstance(graph, FrozenGraph) else graph.freeze()
+        n = len(frozen)
+        self.labels = frozen.labels
+        self.ids = frozen.ids
+        self.version = getattr(graph, "version", None)
+
+        # The cheapest edge between each pair of vertices, in both directions
+        outgoing = [dict() for v in range(n)]
+        incoming = [dict() for v in range(n)]
+        offsets, targets, weights = frozen.offsets, frozen.targets, frozen.weights
+        for v in range(n):
+            for slot in range(offsets[v], offsets[v + 1]):
+                w = targets[slot]
+                weight = weights[slot]
+                if w != v and weight < outgoing[v].get(w, float("inf")):
+                    outgoing[v][w] = weight
+                    incoming[w][v] = weight
+
+        # shortcuts maps (from id, to id) to the id of the skipped vertex
+        self.shortcuts = {}
+        self.ranks = self.contract(outgoing, incoming)
+        self.up = self.searchGraph(outgoing, lambda v, w: self.ranks[w] > self.ranks[v])
+        self.down = self.searchGraph(incoming, lambda v, w: self.ranks[w] > self.ranks[v])
+
+    def __len__(self):
+        """Returns the number of vertices."""
+        return len(self.labels)
+
+    def sizeShortcuts(self):
+        """Returns the number of shortcut edges."""
+        return len(self.shortcuts)
+
+    def isCurrent(self, graph):
+        """Returns True if graph has not changed since the hierarchy
+        was built from it."""
+        return self.version is not None and self.version == graph.version
+
+    def getId(self, label):
+        """Returns the id of the vertex with label.
+        Raises: AttibuteError if a vertex with label is not in the graph."""
+        if not label in self.ids:
+            raise AttributeError("Label " + str(label) + " not in graph.")
+        return self.ids[label]
+
+    # Preprocessing
+
+    def contract(self, outgoing, incoming):
+        """Contracts the vertices in order of importance, adding the
+        shortcuts to outgoing and incoming, and returns their ranks.
+        A vertex's importance is the number of shortcuts its contraction
+        adds less the number of edges it removes, plus the number of its
+        neighbors already contracted, which spreads the contraction
+        evenly over the graph. Importances go stale as neighbors are
+        contracted, so each is recomputed when it reaches the top of the
+        heap and put back if it is no longer the smallest."""
+        n = len(outgoing)
+        contracted = bytearray(n)
+        contractedNeighbors = [0] * n
+        ranks = [0] * n
+
+        def importance(v, shortcuts):
+            edges = sum(1 for w in outgoing[v] if not contracted[w]) + \
+                    sum(1 for u in incoming[v] if not contracted[u])
+            return len(shortcuts) - edges + contractedNeighbors[v]
+
+        heap = [(importance(v, self.findShortcuts(v, outgoing, incoming, contracted)), v)
+                for v in range(n)]
+        heapq.heapify(heap)
+        rank = 0
+        while heap:
+            priority, v = heapq.heappop(heap)
+            shortcuts = self.findShortcuts(v, outgoing, incoming, contracted)
+            priority = importance(v, shortcuts)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, v))
+                continue
+            for u, w, weight in shortcuts:
+                outgoing[u][w] = weight
+                incoming[w][u] = weight
+                self.shortcuts[(u, w)] = v
+            contracted[v] = 1
+            ranks[v] = rank
+            rank += 1
+            for neighbor in set(outgoing[v]).union(incoming[v]):
+                contractedNeighbors[neighbor] += 1
+        return ranks
+
+    def findShortcuts(self, v, outgoing, incoming, contracted):
+        """Returns the (from id, to id, weight) shortcuts needed to
+        contract v: one for each remaining predecessor u and successor w
+        with no path from u to w that avoids v and costs no more than the
+        path through v."""
+        successors = [(w, weight) for w, weight in outgoing[v].items() if not contracted[w]]
+        if not successors:
+            return []
+        longest = max(weight for w, weight in successors)
+        shortcuts = []
+        for u, inWeight in incoming[v].items():
+            if contracted[u]:
+                continue
+            distances = self.witnessSearch(u, v, inWeight + longest, outgoing, contracted)
+            for w, outWeight in successors:
+                if w != u and distances.get(w, float("inf")) > inWeight + outWeight:
+                    shortcuts.append((u, w, inWeight + outWeight))
+        return shortcuts
+
+    def witnessSearch(self, source, avoid, limit, outgoing, contracted):
+        """Returns the distances from source found by a Dijkstra search
+        over the remaining vertices other than avoid, which stops at
+        distance limit or after WITNESS_LIMIT vertices are settled."""
+        distances = {source: 0}
+        heap = [(0, source)]
+        settled = 0
+        while heap and settled < self.WITNESS_LIMIT:
+            distance, v = heapq.heappop(heap)
+            if distance > limit:
+                break
+            if distance > distances[v]:
+                continue
+            settled += 1
+            for w, weight in outgoing[v].items():
+                if w == avoid or contracted[w]:
+                    continue
+                newDistance = distance + weight
+                if newDistance < distances.get(w, float("inf")):
+                    distances[w] = newDistance
+                    heapq.heappush(heap, (newDistance, w))
+        return distances
+
+    def searchGraph(self, adjacency, keep):
+        """Returns the (offsets, targets, weights) CSR arrays of the
+        edges v -> w of adjacency for which keep(v, w) is True."""
+        offsets = array("q", [0])
+        targets = array("q")
+        weights = list()
+        for v, edges in enumerate(adjacency):
+            for w, weight in edges.items():
+                if keep(v, w):
+                    targets.append(w)
+                    weights.append(weight)
+            offsets.append(len(targets))
+        if all(isinstance(weight, int) for weight in weights):
+            return offsets, targets, array("q", weights)
+        return offsets, targets, array("d", weights)
+
+    # Queries
+
+    def cost(self, sourceLabel, targetLabel):
+        """Returns the cost of the shortest path from the source vertex
+        to the target vertex, or None if there is no path.
+        Raises: AttibuteError if a label is not in the graph."""
+        best, meeting, forward, backward = self.search(sourceLabel, targetLabel)
+        return None if meeting is None else best
+
+    def path(self, sourceLabel, targetLabel):
+        """Returns the labels of the vertices on the shortest path from
+        the source vertex to the target vertex, or None if there is no path.
+        Raises: AttibuteError if a label is not in the graph."""
+        best, meeting, forward, backward = self.search(sourceLabel, targetLabel)
+        if meeting is None:
+            return None
+        # The hops of the upward and downward halves of the path
+        hops = []
+        v = meeting
+        while forward[v] is not None:
+            hops.append((forward[v], v))
+            v = forward[v]
+        hops.reverse()
+        v = meeting
+        while backward[v] is not None:
+            hops.append((v, backward[v]))
+            v = backward[v]
+        # Replace each shortcut by the two edges it skips
+        path = [self.getId(sourceLabel)]
+        stack = list(reversed(hops))
+        while stack:
+            u, w = stack.pop()
+            if (u, w) in self.shortcuts:
+                skipped = self.shortcuts[(u, w)]
+                stack.append((skipped, w))
+                stack.append((u, skipped))
+            else:
+                path.append(w)
+        return [self.labels[v] for v in path]
+
+    def search(self, sourceLabel, targetLabel):
+        """Runs the forward search on the upward graph and the backward
+        search on the downward graph, alternately, until neither can
+        improve on the best path found. Returns its cost, its highest
+        vertex (None if there is no path) and the parents of the vertices
+        reached by each search."""
+        source = self.getId(sourceLabel)
+        target = self.getId(targetLabel)
+        parents = ({source: None}, {target: None})
+        distances = ({source: 0}, {target: 0})
+        heaps = ([(0, source)], [(0, target)])
+        graphs = (self.up, self.down)
+        best = 0 if source == target else float("inf")
+        meeting = source if source == target else None
+        side = 0
+        while heaps[0] or heaps[1]:
+            # Alternate between the sides, unless one is finished
+            side = 1 - side
+            if not heaps[side]:
+                side = 1 - side
+            heap = heaps[side]
+            distance, v = heapq.heappop(heap)
+            if distance >= best:
+                # Nothing left on this side can improve the best path
+                heap.clear()
+                continue
+            if distance > distances[side][v]:
+                continue
+            offsets, targets, weights = graphs[side]
+            other = distances[1 - side]
+            for slot in range(offsets[v], offsets[v + 1]):
+                w = targets[slot]
+                newDistance = distance + weights[slot]
+                if newDistance < distances[side].get(w, float("inf")):
+                    distances[side][w] = newDistance
+                    parents[side][w] = v
+                    heapq.heappush(heap, (newDistance, w))
+                    if w in other and newDistance + other[w] < best:
+                        best = newDistance + other[w]
+                        meeting = w
+        return best, meeting, parents[0], parents[1]
+
+    # Storage
+
+    def save(self, path):
+        """Writes the hierarchy to the file at path."""
+        with open(path, "wb") as file:
+            pickle.dump(self.__dict__, file, pickle.HIGHEST_PROTOCOL)
+
+def loadHierarchy(path):
+    """Returns the ContractionHierarchy saved in the file at path.
+    The file is unpickled, so it must come from a trusted source."""
+    with open(path, "rb") as file:
+        state = pickle.load(file)
+    hierarchy = ContractionHierarchy.__new__(ContractionHierarchy)
+    hierarchy.__dict__.update(state)
+    return hierarchy
@@ -0,0 +1,60 @@
+"""
+File: disjointset.py
+
+A DisjointSet (union-find) partitions the integers 0 .. n - 1 into sets.
+find() uses path compression and union() uses union by rank, so a series
+of operations takes nearly constant time per operation.
+"""
+
+class DisjointSet(object):
+    """Represents a partition of 0 .. n - 1 into disjoint sets."""
+
+    def __init__(self, size = 0):
+        """Starts with each of 0 .. size - 1 in a set of its own."""
+        self.parents = list(range(size))
+        self.ranks = bytearray(size)
+        self.count = size
+
+    def __len__(self):
+        """Returns the number of items."""
+        return len(self.parents)
+
+    def sizeSets(self):
+        """Returns the number of sets."""
+        return self.count
+
+    def makeSet(self):
+        """Adds a new item in a set of its own and returns it."""
+        item = len(self.parents)
+        self.parents.append(item)
+        self.ranks.append(0)
+        self.count += 1
+        return item
+
+    def find(self, item):
+        """Returns the representative of the set that contains item."""
+        parents = self.parents
+        root = item
+        while parents[root] != root:
+            root = parents[root]
+        # Path compression: point every item on the path at the root
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+        return root
+
+    def union(self, first, second):
+        """Merges the sets that contain first and second.
+        Returns True if they were different sets, or False if
+        they were already the same set."""
+        first = self.find(first)
+        second = self.find(second)
+        if first == second:
+            return False
+        # Union by rank: hang the shallower tree under the deeper one
+        if self.ranks[first] < self.ranks[second]:
+            first, second = second, first
+        self.parents[second] = first
+        if self.ranks[first] == self.ranks[second]:
+            self.ranks[first] += 1
+        self.count -= 1
+        return True
@@ -0,0 +1,229 @@
+"""
+File: dynamicshortestpaths.py
+
+A DynamicShortestPaths keeps the shortest paths from a start vertex up to
+date as edges are added, removed and reweighted, without running
+shortestPaths again. Each change returns the set of labels of the vertices
+whose cost changed.
+
+The graph is changed through the DynamicShortestPaths' own addVertex,
+removeVertex, addEdge, removeEdge and setEdgeWeight methods, which change
+the graph and then repair the shortest-path tree in the manner of
+Ramalingam and Reps:
+
+- When an edge is added or becomes cheaper, only the vertices that it
+  brings closer can change. A Dijkstra search starts from its destination
+  and stops wherever a cost does not improve.
+- When an edge of the tree is removed or becomes more expensive, only the
+  vertices in the subtree below it can change. They are collected, each is
+  given the cheapest cost over its incoming edges from outside the
+  subtree, and a Dijkstra search settles them from there. Those that are
+  not reached can no longer be reached from the start vertex.
+
+Either way the work grows with the number of vertices whose cost changes
+and their edges, not with the size of the graph. Weights must not be
+negative.
+
+The paths record the graph's version after each of their own changes. If
+the graph has changed in any other way, e.g. through LinkedEdge.setWeight
+or the graph's own setEdgeWeight, the versions differ and the paths are
+found again with shortestPaths the next time they are used.
+"""
+
+import heapq
+from itertools import count
+from graph import LinkedUndirectedGraph
+from algorithm import shortestPaths
+
+class DynamicShortestPaths(object):
+    """Represents the shortest paths from a start vertex that
+    follow changes to their graph."""
+
+    def __init__(self, graph, startLabel):
+        """Finds the shortest paths in graph from the vertex with
+        startLabel with shortestPaths."""
+        self.graph = graph
+        self.startLabel = startLabel
+        self.rebuild()
+
+    def rebuild(self):
+        """Finds the paths from scratch with shortestPaths."""
+        graph, startLabel = self.graph, self.startLabel
+        # The cost of each reachable vertex and the edge of the tree
+        # that reaches it, by label
+        self.costs = {startLabel: 0}
+        self.parents = {startLabel: None}
+        for label, info in shortestPaths(graph, startLabel).items():
+            self.costs[label] = info["cost"]
+            self.parents[label] = info["edge"]
+        self.version = graph.version
+
+    def refresh(self):
+        """Finds the paths again if the graph has changed other than
+        through this object."""
+        if self.version != self.graph.version:
+            self.rebuild()
+
+    def getCost(self, label):
+        """Returns the cost of the shortest path to the vertex with
+        label, or None if it is not reachable."""
+        self.refresh()
+        return self.costs.get(label)
+
+    def getEdge(self, label):
+        """Returns the edge that reaches the vertex with label on its
+        shortest path, or None for the start vertex or if it is not
+        reachable."""
+        self.refresh()
+        return self.parents.get(label)
+
+    def paths(self):
+        """Returns the shortest paths in the same form as shortestPaths."""
+        self.refresh()
+        return {
+            label: {
+                "edge": edge,
+                "cost": self.costs[label]
+            }
+            for label, edge in self.parents.items() if edge is not None
+        }
+
+    # Changes to the graph
+
+    def addVertex(self, label):
+        """Adds a vertex with label to the graph. It is not reachable
+        until an edge leads to it."""
+        self.refresh()
+        self.graph.addVertex(label)
+        self.version = self.graph.version
+
+    def removeVertex(self, label):
+        """Removes the vertex with label and its edges from the graph.
+        Returns the set of labels of the vertices whose cost changed.
+        Raises: ValueError if the vertex is the start vertex."""
+        if label == self.startLabel:
+            raise ValueError("The start vertex cannot be removed")
+        self.refresh()
+        changed = set()
+        if not self.graph.containsVertex(label):
+            return changed
+        vertex = self.graph.getVertex(label)
+        edges = list(vertex.incidentEdges()) + list(self.graph.incomingEdges(label))
+        for edge in edges:
+            changed |= self.removeEdge(edge.getFromVertex().getLabel(), edge.getToVertex().getLabel())
+        self.graph.removeVertex(label)
+        self.version = self.graph.version
+        changed.discard(label)
+        return changed
+
+    def addEdge(self, fromLabel, toLabel, weight):
+        """Adds an edge to the graph. Returns the set of labels of the
+        vertices whose cost changed."""
+        self.refresh()
+        self.graph.addEdge(fromLabel, toLabel, weight)
+        self.version = self.graph.version
+        return self.lower(self.graph.getEdge(fromLabel, toLabel))
+
+    def removeEdge(self, fromLabel, toLabel):
+        """Removes an edge from the graph. Returns the set of labels of
+        the vertices whose cost changed."""
+        self.refresh()
+        edge = self.graph.getEdge(fromLabel, toLabel)
+        if not self.graph.removeEdge(fromLabel, toLabel):
+            return set()
+        self.version = self.graph.version
+        return self.raiseEdge(edge)
+
+    def setEdgeWeight(self, fromLabel, toLabel, weight):
+        """Changes the weight of an edge in the graph. Returns the set of
+        labels of the vertices whose cost changed.
+        Raises: AttibuteError if the vertices are not connected."""
+        self.refresh()
+        edge = self.graph.getEdge(fromLabel, toLabel)
+        oldWeight = edge.getWeight() if edge is not None else None
+        self.graph.setEdgeWeight(fromLabel, toLabel, weight)
+        self.version = self.graph.version
+        if weight < oldWeight:
+            return self.lower(edge)
+        if weight > oldWeight:
+            return self.raiseEdge(edge)
+        return set()
+
+    # Helpers
+
+    def ends(self, edge):
+        """Returns the (from vertex, to vertex) pairs in which edge can
+        be followed: both ways for an undirected edge."""
+        fromVertex, toVertex = edge.getFromVertex(), edge.getToVertex()
+        if isinstance(self.graph, LinkedUndirectedGraph):
+            return ((fromVertex, toVertex), (toVertex, fromVertex))
+        return ((fromVertex, toVertex),)
+
+    def lower(self, edge):
+        """Repairs the paths after edge has been added or made cheaper."""
+        heap = []
+        changed = set()
+        ties = count()
+        for fromVertex, toVertex in self.ends(edge):
+            fromLabel = fromVertex.getLabel()
+            if fromLabel in self.costs:
+                self.relax(toVertex.getLabel(), self.costs[fromLabel] + edge.getWeight(),
+                           edge, heap, ties, changed)
+        self.settle(heap, ties, changed)
+        return changed
+
+    def raiseEdge(self, edge):
+        """Repairs the paths after edge has been removed or made more
+        expensive."""
+        roots = [toVertex.getLabel() for fromVertex, toVertex in self.ends(edge)
+                 if self.parents.get(toVertex.getLabel()) is edge]
+        if not roots:
+            return set()
+
+        # The subtree below the edge, whose costs are forgotten
+        affected = roots
+        oldCosts = {}
+        for label in affected:
+            oldCosts[label] = self.costs.pop(label)
+            self.parents.pop(label)
+            vertex = self.graph.getVertex(label)
+            for child in vertex.incidentEdges():
+                other = child.getOtherVertex(vertex).getLabel()
+                if self.parents.get(other) is child:
+                    affected.append(other)
+
+        # Reach the subtree again from the vertices outside it
+        heap = []
+        changed = set()
+        ties = count()
+        for label in affected:
+            vertex = self.graph.getVertex(label)
+            for incoming in self.graph.incomingEdges(label):
+                other = incoming.getOtherVertex(vertex).getLabel()
+                if other in self.costs:
+                    self.relax(label, self.costs[other] + incoming.getWeight(),
+                               incoming, heap, ties, changed)
+        self.settle(heap, ties, changed)
+        return {label for label in affected if self.costs.get(label) != oldCosts[label]}
+
+    def relax(self, label, cost, edge, heap, ties, changed):
+        """Makes edge the tree edge of the vertex with label if cost
+        improves on its current cost."""
+        if label in self.costs and not cost < self.costs[label]:
+            return
+        self.costs[label] = cost
+        self.parents[label] = edge
+        changed.add(label)
+        heapq.heappush(heap, (cost, next(ties), label))
+
+    def settle(self, heap, ties, changed):
+        """Runs Dijkstra's algorithm from the vertices in heap, following
+        only the edges that improve a cost."""
+        while heap:
+            cost, tie, label = heapq.heappop(heap)
+            if cost > self.costs[label]:
+                continue
+            vertex = self.graph.getVertex(label)
+            for edge in vertex.incidentEdges():
+                self.relax(edge.getOtherVertex(vertex).getLabel(), cost + edge.getWeight(),
+                           edge, heap, ties, changed)
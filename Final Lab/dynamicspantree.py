@@ -0,0 +1,236 @@
+"""
+File: dynamicspantree.py
+
+A DynamicSpanTree keeps a minimum spanning forest of a graph up to date as
+edges are added, removed and reweighted, without running spanTree again.
+
+The graph is changed through the DynamicSpanTree's own addVertex,
+removeVertex, addEdge, removeEdge and setEdgeWeight methods, which change
+the graph and then repair the forest. Edges are taken as undirected, so
+either edge of a mirrored pair may be the one in the forest.
+
+- A new edge, or an edge that becomes cheaper, either joins two trees or
+  closes a cycle with the tree path between its vertices. By the cycle
+  property it replaces the most expensive edge on that path if it is
+  cheaper. The path maximum comes from a LinkCutTree in O(log n) time.
+- When a tree edge is removed or becomes more expensive, the tree splits
+  in two, and the cheapest edge that crosses between the halves rejoins
+  them. The halves are explored together so that the search stops with
+  the smaller one, and only the edges of its vertices are scanned.
+
+The forest records the graph's version after each of its own changes. If
+the graph has changed in any other way, e.g. through LinkedEdge.setWeight,
+the versions differ and the forest is rebuilt with spanForest the next
+time it is used.
+"""
+
+from linkcuttree import LinkCutTree
+from algorithm import spanForest
+
+class DynamicSpanTree(object):
+    """Represents a minimum spanning forest that follows
+    changes to its graph."""
+
+    def __init__(self, graph):
+        """Builds the forest of graph with spanForest."""
+        self.graph = graph
+        self.rebuild()
+
+    def rebuild(self):
+        """Builds the forest from scratch with spanForest."""
+        graph = self.graph
+        self.tree = LinkCutTree()
+        # The tree node of each vertex, by label
+        self.vertexNodes = {}
+        # The forest edges and their tree nodes, by the id of the edge,
+        # and the forest edges by their tree nodes
+        self.treeEdges = {}
+        self.edgeNodes = {}
+        self.nodeEdges = {}
+        # The forest edges at each vertex, by the neighbor's label
+        self.treeNeighbors = {}
+        for vertex in graph.getVertices():
+            self.insertVertex(vertex.getLabel())
+        for edge in spanForest(graph):
+            self.linkEdge(edge)
+        self.version = graph.version
+
+    def refresh(self):
+        """Rebuilds the forest if the graph has changed other than
+        through this forest."""
+        if self.version != self.graph.version:
+            self.rebuild()
+
+    def __len__(self):
+        """Returns the number of edges in the forest."""
+        self.refresh()
+        return len(self.treeEdges)
+
+    def __iter__(self):
+        """Supports iteration over the edges in the forest."""
+        self.refresh()
+        return iter(self.treeEdges.values())
+
+    def edges(self):
+        """Returns the edges in the forest, like spanTree."""
+        self.refresh()
+        return list(self.treeEdges.values())
+
+    def totalWeight(self):
+        """Returns the total weight of the edges in the forest."""
+        self.refresh()
+        return sum(edge.getWeight() for edge in self.treeEdges.values())
+
+    def containsEdge(self, edge):
+        """Returns True if edge is in the forest."""
+        self.refresh()
+        return id(edge) in self.treeEdges
+
+    # Changes to the graph
+
+    def addVertex(self, label):
+        """Adds a vertex with label to the graph and the forest."""
+        self.refresh()
+        self.graph.addVertex(label)
+        self.insertVertex(label)
+        self.version = self.graph.version
+
+    def removeVertex(self, label):
+        """Removes the vertex with label and its edges from the graph
+        and the forest. Returns True if the vertex was removed,
+        or False otherwise."""
+        self.refresh()
+        if not self.graph.containsVertex(label):
+            return False
+        vertex = self.graph.getVertex(label)
+        edges = list(vertex.incidentEdges()) + list(self.graph.incomingEdges(label))
+        for edge in edges:
+            self.removeEdge(edge.getFromVertex().getLabel(), edge.getToVertex().getLabel())
+        self.graph.removeVertex(label)
+        self.tree.removeNode(self.vertexNodes.pop(label))
+        del self.treeNeighbors[label]
+        self.version = self.graph.version
+        return True
+
+    def addEdge(self, fromLabel, toLabel, weight):
+        """Adds an edge to the graph and, if it is cheaper than the
+        most expensive edge on the tree path between its vertices,
+        swaps it into the forest."""
+        self.refresh()
+        self.graph.addEdge(fromLabel, toLabel, weight)
+        self.insertEdge(self.graph.getEdge(fromLabel, toLabel))
+        self.version = self.graph.version
+
+    def removeEdge(self, fromLabel, toLabel):
+        """Removes an edge from the graph and, if it was in the forest,
+        replaces it with the cheapest edge that rejoins the two trees.
+        Returns True if the edge was removed, or False otherwise."""
+        self.refresh()
+        edge = self.graph.getEdge(fromLabel, toLabel)
+        if not self.graph.removeEdge(fromLabel, toLabel):
+            return False
+        if id(edge) in self.treeEdges:
+            self.cutEdge(edge)
+            self.reconnect(edge.getFromVertex().getLabel(), edge.getToVertex().getLabel())
+        self.version = self.graph.version
+        return True
+
+    def setEdgeWeight(self, fromLabel, toLabel, weight):
+        """Changes the weight of an edge in the graph and repairs the forest.
+        Raises: AttibuteError if the vertices are not connected."""
+        self.refresh()
+        edge = self.graph.getEdge(fromLabel, toLabel)
+        oldWeight = edge.getWeight() if edge is not None else None
+        self.graph.setEdgeWeight(fromLabel, toLabel, weight)
+        self.version = self.graph.version
+        if id(edge) in self.treeEdges:
+            self.tree.setValue(self.edgeNodes[id(edge)], weight)
+            if weight > oldWeight:
+                # Another edge across the split may now be cheaper
+                self.cutEdge(edge)
+                self.reconnect(edge.getFromVertex().getLabel(), edge.getToVertex().getLabel())
+        elif weight < oldWeight:
+            self.insertEdge(edge)
+
+    # Helpers
+
+    def insertVertex(self, label):
+        self.vertexNodes[label] = self.tree.addNode(float("-inf"))
+        self.treeNeighbors[label] = {}
+
+    def linkEdge(self, edge):
+        """Adds edge to the forest."""
+        fromLabel = edge.getFromVertex().getLabel()
+        toLabel = edge.getToVertex().getLabel()
+        node = self.tree.addNode(edge.getWeight())
+        self.tree.link(self.vertexNodes[fromLabel], node)
+        self.tree.link(node, self.vertexNodes[toLabel])
+        self.treeEdges[id(edge)] = edge
+        self.edgeNodes[id(edge)] = node
+        self.nodeEdges[node] = edge
+        self.treeNeighbors[fromLabel][toLabel] = edge
+        self.treeNeighbors[toLabel][fromLabel] = edge
+
+    def cutEdge(self, edge):
+        """Removes edge from the forest."""
+        fromLabel = edge.getFromVertex().getLabel()
+        toLabel = edge.getToVertex().getLabel()
+        node = self.edgeNodes.pop(id(edge))
+        del self.treeEdges[id(edge)]
+        del self.nodeEdges[node]
+        self.tree.cut(self.vertexNodes[fromLabel], node)
+        self.tree.cut(node, self.vertexNodes[toLabel])
+        self.tree.removeNode(node)
+        del self.treeNeighbors[fromLabel][toLabel]
+        del self.treeNeighbors[toLabel][fromLabel]
+
+    def insertEdge(self, edge):
+        """Adds edge to the forest if it joins two trees, or swaps it for
+        the most expensive edge on the cycle it closes if it is cheaper."""
+        fromLabel = edge.getFromVertex().getLabel()
+        toLabel = edge.getToVertex().getLabel()
+        if fromLabel == toLabel:
+            return
+        fromNode, toNode = self.vertexNodes[fromLabel], self.vertexNodes[toLabel]
+        if self.tree.connected(fromNode, toNode):
+            node = self.tree.pathMax(fromNode, toNode)
+            if not edge.getWeight() < self.tree.getValue(node):
+                return
+            self.cutEdge(self.nodeEdges[node])
+        self.linkEdge(edge)
+
+    def reconnect(self, firstLabel, secondLabel):
+        """Rejoins the trees of two vertices that were split apart with
+        the cheapest edge between them, if there is one."""
+        side = self.smallerSide(firstLabel, secondLabel)
+        if side is None:
+            return
+        best = None
+        for label in side:
+            vertex = self.graph.getVertex(label)
+            edges = list(vertex.incidentEdges()) + list(self.graph.incomingEdges(label))
+            for edge in edges:
+                other = edge.getOtherVertex(vertex).getLabel()
+                if not other in side and \
+                   (best is None or edge.getWeight() < best.getWeight()):
+                    best = edge
+        if best is not None:
+            self.linkEdge(best)
+
+    def smallerSide(self, firstLabel, secondLabel):
+        """Explores the trees of the two vertices a step at a time from
+        each, and returns the set of labels of whichever is explored
+        completely first, or None if they are the same tree."""
+        sides = ({firstLabel}, {secondLabel})
+        frontiers = ([firstLabel], [secondLabel])
+        while True:
+            for side, frontier, other in zip(sides, frontiers, reversed(sides)):
+                if not frontier:
+                    return side
+                label = frontier.pop()
+                for neighbor in self.treeNeighbors[label]:
+                    if neighbor in other:
+                        return None
+                    if not neighbor in side:
+                        side.add(neighbor)
+                        frontier.append(neighbor)
@@ -0,0 +1,111 @@
+"""
+File: frozengraph.py
+
+A FrozenGraph is an immutable compressed-sparse-row (CSR) snapshot of a
+LinkedDirectedGraph, created with LinkedDirectedGraph.freeze().
+
+The vertices keep the ids 0 .. n - 1 that the graph gave them. The
+outgoing edges of vertex i are stored in the slots offsets[i] ..
+offsets[i + 1] - 1 of the flat arrays targets (the id of the destination
+vertex) and weights (the weight of the edge). labels and ids translate
+between vertex ids and labels.
+
+vertices and edges hold the LinkedVertex and LinkedEdge objects that each
+id and slot was built from, so that algorithms can report their results
+with the graph's own objects. An undirected edge is stored in the rows of
+both of its vertices, so it occupies two slots.
+
+mirrors holds, for each slot, the slot of the edge that runs the other way
+between the same vertices, or -1 if there is none. The two slots of an
+undirected edge are each other's mirrors, and a loop is its own mirror.
+"""
+
+from array import array
+
+class FrozenGraph(object):
+    """Represents a read-only CSR snapshot of a graph."""
+
+    def __init__(self, graph):
+        """Builds the snapshot from the vertices and edges of graph."""
+        vertices = tuple(graph.vertexList)
+        labels = tuple(vertex.getLabel() for vertex in vertices)
+        ids = {label: vertexId for vertexId, label in enumerate(labels)}
+        offsets = array("q", [0])
+        targets = array("q")
+        weights = list()
+        edges = list()
+        for vertex in vertices:
+            for edge in vertex.incidentEdges():
+                targets.append(edge.getOtherVertex(vertex).id)
+                weights.append(edge.getWeight())
+                edges.append(edge)
+            offsets.append(len(targets))
+        # The slot of each edge, by from id * n + to id
+        n = len(vertices)
+        slots = dict()
+        for v in range(n):
+            for slot in range(offsets[v], offsets[v + 1]):
+                slots[v * n + targets[slot]] = slot
+        mirrors = array("q", [-1]) * len(targets)
+        for v in range(n):
+            for slot in range(offsets[v], offsets[v + 1]):
+                mirrors[slot] = slots.get(targets[slot] * n + v, -1)
+        object.__setattr__(self, "vertices", vertices)
+        object.__setattr__(self, "labels", labels)
+        object.__setattr__(self, "ids", ids)
+        object.__setattr__(self, "offsets", offsets)
+        object.__setattr__(self, "targets", targets)
+        object.__setattr__(self, "mirrors", mirrors)
+        object.__setattr__(self, "weights", tuple(weights))
+        object.__setattr__(self, "edges", tuple(edges))
+        object.__setattr__(self, "edgeCount", graph.sizeEdges())
+
+    def __setattr__(self, name, value):
+        """The snapshot cannot be modified."""
+        raise AttributeError("A FrozenGraph cannot be modified.")
+
+    def __len__(self):
+        """Returns the number of vertices."""
+        return len(self.labels)
+
+    def sizeVertices(self):
+        """Returns the number of vertices."""
+        return len(self.labels)
+
+    def sizeEdges(self):
+        """Returns the number of edges."""
+        return self.edgeCount
+
+    def containsVertex(self, label):
+        return label in self.ids
+
+    def getId(self, label):
+        """Returns the id of the vertex with label.
+        Precondition: a vertex with label must be in the graph.
+        Raises: AttibuteError if a vertex with label is not in the graph."""
+        if not label in self.ids:
+            raise AttributeError("Label " + str(label) + " not in graph.")
+        return self.ids[label]
+
+    def getLabel(self, vertexId):
+        """Returns the label of the vertex with the given id."""
+        return self.labels[vertexId]
+
+    def neighborIds(self, vertexId):
+        """Returns the ids of the destination vertices of the
+        outgoing edges of the given vertex."""
+        return self.targets[self.offsets[vertexId]:self.offsets[vertexId + 1]]
+
+    def __str__(self):
+        """Returns the string representation of the graph."""
+        result = str(len(self)) + " Vertices: "
+        for label in self.labels:
+            result += " " + str(label)
+        result += "\n"
+        result += str(self.sizeEdges()) + " Edges: "
+        for vertexId, vertex in enumerate(self.vertices):
+            for slot in range(self.offsets[vertexId], self.offsets[vertexId + 1]):
+                # List an undirected edge only from its first vertex
+                if self.edges[slot].vertex1 is vertex:
+                    result += " " + str(self.edges[slot])
+        return result
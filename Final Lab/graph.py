@@ -10,17 +10,39 @@ Other added methods:
     LinkedEdge(): 
         getFromVertex() : Returns the edge's start vertex.
         __lt__ : Supports comparison edges by weight
+    LinkedDirectedGraph():
+        freeze() : Returns an immutable CSR snapshot (FrozenGraph) of the graph.
+    LinkedUndirectedGraph():
+        An undirected graph that stores one edge shared by both vertices
+        of each connection.
+        incomingEdges(), predecessors() : Iterate over the edges directed at
+            a vertex and their source vertices.
+        edges(), neighboringVertices() : Return lazy views that support len().
+        getVertexById() : Vertices have dense integer ids, kept dense on removal.
+        version : Incremented by every change, including LinkedEdge.setWeight()
+            on one of the graph's edges; isDirected() is O(1), and
+            hasCycle() and isConnected() are cached until the next change.
+        traverse() : Iterative depth-first or breadth-first traversal with
+            pre-order, post-order and non-tree edge hooks and early exit.
+        componentCount(), componentId() : Connected components, kept in a
+            union-find structure as edges are added.
     
         
 """
 
+from collections import deque
 from abstractcollection import AbstractCollection
+from disjointset import DisjointSet
+from frozengraph import FrozenGraph
 from grid import Grid
 
 class LinkedEdge(object):
     
     # An edge has a source vertex, a destination vertex,
     # a weight, and a mark attribute.
+    # Slots instead of a per-edge __dict__ keep large graphs compact.
+
+    __slots__ = ("vertex1", "vertex2", "weight", "mark")
 
     def __init__(self, fromVertex, toVertex, weight = None):         
         self.vertex1 = fromVertex
@@ -70,8 +92,13 @@ class LinkedEdge(object):
         self.mark = True
     
     def setWeight(self, weight):
-        """Sets the weight on the edge to weight."""
-        self.weight = weight     
+        """Sets the weight on the edge to weight, and increments the
+        version of the graph that holds the edge, so that results
+        cached for the old weight are not used."""
+        self.weight = weight
+        graph = self.vertex1.graph
+        if graph is not None:
+            graph.version += 1
           
     def __lt__(self, other):
         return self.getWeight() < other.getWeight()
@@ -84,13 +111,30 @@ class LinkedEdge(object):
 
 class LinkedVertex(object):
 
-    # A vertex has a label, a list of incident edges,
-    # and a mark attribute.
+    # A vertex has a label, a dictionary of incident edges keyed
+    # by the label of the other vertex, a dictionary of incoming
+    # edges keyed by the label of their source vertex, and a mark
+    # attribute. The dictionaries keep the edges in insertion
+    # order, so edgeIndex also serves as the ordered edge list.
+    # A vertex in a graph also has a dense integer id, assigned
+    # by the graph, that algorithms use to index their working
+    # state, and a reference to the graph, so that changes made
+    # through its edges can update the graph's version.
+
+    __slots__ = ("label", "edgeIndex", "inEdgeIndex", "mark", "id", "graph")
 
-    def __init__(self, label):
+    def __init__(self, label, vertexId = None, graph = None):
         self.label = label
-        self.edgeList = list()
+        self.edgeIndex = dict()
+        self.inEdgeIndex = dict()
         self.mark = False
+        self.id = vertexId
+        self.graph = graph
+
+    @property
+    def edgeList(self):
+        """The incident edges of the vertex, in insertion order."""
+        return self.edgeIndex.values()
 
     def clearMark(self):
         """Clears the mark on the vertex."""
@@ -107,9 +151,21 @@ class LinkedVertex(object):
     
     def setLabel(self, label, g):
         """Sets the vertex's label to label."""
-        g.vertices.pop(self.label, None)
+        oldLabel = self.label
+        g.vertices.pop(oldLabel, None)
         g.vertices[label] = self
-        self.label = label          
+        g.version += 1
+        self.label = label
+        # Rekey the neighbors' indexes of this vertex, keeping their order
+        for edge in list(self.inEdgeIndex.values()):
+            source = edge.getFromVertex()
+            source.edgeIndex = rekey(source.edgeIndex, oldLabel, label)
+        for edge in list(self.edgeIndex.values()):
+            other = edge.getOtherVertex(self)
+            other.inEdgeIndex = rekey(other.inEdgeIndex, oldLabel, label)
+            if other.edgeIndex.get(oldLabel) is edge:
+                # An undirected edge is shared by both of its vertices
+                other.edgeIndex = rekey(other.edgeIndex, oldLabel, label)
 
     def setMark(self):
         """Sets the mark on the vertex."""
@@ -135,37 +191,115 @@ class LinkedVertex(object):
     def addEdgeTo(self, toVertex, weight):
         """Connects the vertices with an edge."""
         edge = LinkedEdge(self, toVertex, weight)
-        self.edgeList.append(edge)
+        self.edgeIndex[toVertex.label] = edge
+        toVertex.inEdgeIndex[self.label] = edge
+
+    def connectTo(self, toVertex, weight):
+        """Connects the vertices with one undirected edge,
+        shared by both vertices."""
+        edge = LinkedEdge(self, toVertex, weight)
+        self.edgeIndex[toVertex.label] = edge
+        toVertex.edgeIndex[self.label] = edge
     
     def getEdgeTo(self, toVertex):
         """Returns the connecting edge if it exists, or
         None otherwise."""
-        edge = LinkedEdge(self, toVertex)
-        try:
-            return self.edgeList[self.edgeList.index(edge)]
-        except:
-            return None
+        return self.edgeIndex.get(toVertex.label)
 
     def incidentEdges(self):
         """Returns the incident edges of this vertex."""
-        return iter(self.edgeList)
+        return iter(self.edgeIndex.values())
+
+    def incomingEdges(self):
+        """Returns the edges directed at this vertex."""
+        return iter(self.inEdgeIndex.values())
         
     def neighboringVertices(self):
-        """Returns the neighboring vertices of this vertex."""
-        vertices = list()
-        for edge in self.edgeList:
-            vertices.append(edge.getOtherVertex(self))
-        return iter(vertices)
+        """Returns a view of the neighboring vertices of this vertex."""
+        return NeighborsView(self, self.edgeIndex.values())
+
+    def predecessorVertices(self):
+        """Returns a view of the vertices with an edge directed at this vertex."""
+        return NeighborsView(self, self.inEdgeIndex.values())
             
     def removeEdgeTo(self, toVertex):
         """Returns True if the edge exists and is removed,
         or False otherwise."""
-        edge = LinkedEdge(self, toVertex)
-        if edge in self.edgeList:
-            self.edgeList.remove(edge)
-            return True
-        else:
+        if self.edgeIndex.pop(toVertex.label, None) is None:
             return False
+        toVertex.inEdgeIndex.pop(self.label, None)
+        return True
+
+    def disconnectFrom(self, toVertex):
+        """Returns True if the undirected edge exists and is removed,
+        or False otherwise."""
+        if self.edgeIndex.pop(toVertex.label, None) is None:
+            return False
+        toVertex.edgeIndex.pop(self.label, None)
+        return True
+
+
+def rekey(index, oldKey, newKey):
+    """Returns a copy of the dictionary index with oldKey
+    replaced by newKey, in the same order."""
+    return {(newKey if key == oldKey else key): value
+            for key, value in index.items()}
+
+
+class NeighborsView(object):
+    """A view of the vertices at the other end of some of a
+    vertex's edges. Nothing is copied; the view reads the
+    vertex's edge index each time it is iterated."""
+
+    __slots__ = ("vertex", "edges")
+
+    def __init__(self, vertex, edges):
+        self.vertex = vertex
+        self.edges = edges
+
+    def __len__(self):
+        """Returns the number of neighboring vertices."""
+        return len(self.edges)
+
+    def __iter__(self):
+        """Supports iteration over the neighboring vertices."""
+        vertex = self.vertex
+        for edge in self.edges:
+            yield edge.getOtherVertex(vertex)
+
+
+class EdgesView(object):
+    """A view of all the edges in a graph. Nothing is copied;
+    the view reads the vertices' edge indexes each time it is
+    iterated."""
+
+    __slots__ = ("graph",)
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __len__(self):
+        """Returns the number of edges."""
+        return self.graph.sizeEdges()
+
+    def __iter__(self):
+        """Supports iteration over the edges."""
+        for vertex in self.graph.vertices.values():
+            yield from vertex.edgeIndex.values()
+
+
+class UndirectedEdgesView(EdgesView):
+    """A view of all the edges in an undirected graph. Each shared
+    edge is visited once, from its first vertex."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        """Supports iteration over the edges."""
+        for vertex in self.graph.vertices.values():
+            for edge in vertex.edgeIndex.values():
+                if edge.vertex1 is vertex:
+                    yield edge
 
 
 class LinkedDirectedGraph(AbstractCollection):
@@ -173,11 +307,30 @@ class LinkedDirectedGraph(AbstractCollection):
     INFINITY = "-"   # For building a distance matrix
 
     # A graph has a count of vertices, a count of edges,
-    # and a dictionary of label/vertex pairs.
+    # a dictionary of label/vertex pairs, and a list of the
+    # vertices indexed by their ids. The ids are always
+    # 0 .. number of vertices - 1.
+    # The version is incremented by every change to the vertices
+    # or edges. Derived properties of the graph are cached for
+    # the current version, and the number of edges whose mirror
+    # edge is missing is kept up to date for isDirected().
+    # The connected components of the graph, with its edges taken
+    # as undirected, are kept in a union-find structure indexed by
+    # vertex id, along with the number of edges that closed a cycle.
+    # They are updated as edges are added, and rebuilt on demand
+    # after a removal.
 
     def __init__(self, sourceCollection = None):
         self.edgeCount = 0
         self.vertices = {}
+        self.vertexList = []
+        self.version = 0
+        self.propertyCache = {}
+        self.cacheVersion = 0
+        self.unmatchedEdges = 0
+        self.components = DisjointSet()
+        self.cycleEdges = 0
+        self.componentsValid = True
         AbstractCollection.__init__(self, sourceCollection)
         
     # Methods for clearing, marks, sizes, string rep
@@ -186,7 +339,13 @@ class LinkedDirectedGraph(AbstractCollection):
         """Clears the graph."""
         self.size = 0
         self.edgeCount = 0
-        self.vertices = {}        
+        self.vertices = {}
+        self.vertexList = []
+        self.unmatchedEdges = 0
+        self.components = DisjointSet()
+        self.cycleEdges = 0
+        self.componentsValid = True
+        self.version += 1
 
     def clearEdgeMarks(self):
         """Clears all the edge marks."""
@@ -230,8 +389,13 @@ class LinkedDirectedGraph(AbstractCollection):
         is already in the graph."""
         if self.containsVertex(label):
             raise AttributeError("Label " + str(label) + " already in graph.""")
-        self.vertices[label] = LinkedVertex(label)
+        vertex = LinkedVertex(label, len(self.vertexList), self)
+        self.vertices[label] = vertex
+        self.vertexList.append(vertex)
+        if self.componentsValid:
+            self.components.makeSet()
         self.size += 1
+        self.version += 1
         
     def containsVertex (self, label):
         return label in self.vertices
@@ -242,6 +406,21 @@ class LinkedDirectedGraph(AbstractCollection):
         if not self.containsVertex(label):
             raise AttributeError("Label " + str(label) + " not in graph.""")
         return self.vertices[label]
+
+    def getVertexById(self, vertexId):
+        """Returns the vertex with the given id."""
+        return self.vertexList[vertexId]
+
+    def releaseVertexId(self, vertex):
+        """Gives the id of a removed vertex to the vertex with
+        the highest id, so that the ids stay dense, and detaches
+        the removed vertex from the graph."""
+        last = self.vertexList.pop()
+        if not last is vertex:
+            self.vertexList[vertex.id] = last
+            last.id = vertex.id
+        vertex.id = None
+        vertex.graph = None
     
     def removeVertex(self,  label):
         """Returns True if the vertex was removed, or False otherwise."""
@@ -249,16 +428,23 @@ class LinkedDirectedGraph(AbstractCollection):
         if removedVertex is None: 
             return False
         
-        # Examine all other vertices to remove edges
-        # directed at the removed vertex
-        for vertex in self.getVertices():
-            if vertex.removeEdgeTo(removedVertex): 
-                self.edgeCount -= 1
+        # Remove the edges directed at the removed vertex
+        # from their source vertices
+        for edge in list(removedVertex.incomingEdges()):
+            edge.getFromVertex().removeEdgeTo(removedVertex)
+            self.updateUnmatchedEdges(edge.getFromVertex(), removedVertex, -1)
+            self.edgeCount -= 1
 
-        # Examine all edges from the removed vertex to others
+        # Remove the edges from the removed vertex to others
+        # from the incoming indexes of their destinations
         for edge in removedVertex.incidentEdges():
+            edge.getToVertex().inEdgeIndex.pop(removedVertex.label, None)
+            self.updateUnmatchedEdges(removedVertex, edge.getToVertex(), -1)
             self.edgeCount -= 1
+        self.releaseVertexId(removedVertex)
+        self.componentsValid = False
         self.size -= 1
+        self.version += 1
         return True
     
     # Methods related to edges
@@ -276,8 +462,15 @@ class LinkedDirectedGraph(AbstractCollection):
             raise AttributeError("An edge already connects " + \
                                  str(fromLabel) + " and " + \
                                  str(toLabel))
+        # The mirror of an existing edge adds no new connection
+        mirrored = not fromVertex is toVertex and \
+                   toVertex.getEdgeTo(fromVertex) is not None
         fromVertex.addEdgeTo(toVertex, weight)
+        self.updateUnmatchedEdges(fromVertex, toVertex, 1)
+        if not mirrored:
+            self.joinComponents(fromVertex, toVertex)
         self.edgeCount += 1
+        self.version += 1
     
     def containsEdge(self, fromLabel, toLabel):
         """Returns True if an edge connects the vertices,
@@ -305,9 +498,92 @@ class LinkedDirectedGraph(AbstractCollection):
         toVertex   = self.getVertex(toLabel)     
         edgeRemovedFlg = fromVertex.removeEdgeTo(toVertex)
         if edgeRemovedFlg: 
+            self.updateUnmatchedEdges(fromVertex, toVertex, -1)
+            self.componentsValid = False
             self.edgeCount -= 1
+            self.version += 1
         return edgeRemovedFlg
 
+    def setEdgeWeight(self, fromLabel, toLabel, weight):
+        """Sets the weight of the edge connecting the two vertices.
+        Precondition: vertices with fromLabel and toLabel must
+        already be in the graph and be connected by an edge.
+        Raises: AttibuteError if the vertices are not already
+        in the graph or they are not connected."""
+        edge = self.getEdge(fromLabel, toLabel)
+        if edge is None:
+            raise AttributeError("No edge connects " + \
+                                 str(fromLabel) + " and " + \
+                                 str(toLabel))
+        # The edge increments the version
+        edge.setWeight(weight)
+
+    def updateUnmatchedEdges(self, fromVertex, toVertex, change):
+        """Updates the count of edges without a mirror edge when the
+        edge from fromVertex to toVertex is added (change is 1) or
+        removed (change is -1)."""
+        if fromVertex is toVertex:
+            return
+        if toVertex.getEdgeTo(fromVertex):
+            self.unmatchedEdges -= change
+        else:
+            self.unmatchedEdges += change
+
+    def joinComponents(self, fromVertex, toVertex):
+        """Merges the components of the vertices of a new connection,
+        counting the connection as closing a cycle if they were
+        already in the same component."""
+        if self.componentsValid and \
+           not self.components.union(fromVertex.id, toVertex.id):
+            self.cycleEdges += 1
+
+    def connections(self):
+        """Supports iteration over the edges of the graph, taken as
+        undirected, with each mirrored pair of edges visited once."""
+        for edge in self.edges():
+            fromVertex, toVertex = edge.getFromVertex(), edge.getToVertex()
+            if fromVertex.id <= toVertex.id or \
+               toVertex.getEdgeTo(fromVertex) is None:
+                yield edge
+
+    def updateComponents(self):
+        """Rebuilds the components if a removal has made them stale."""
+        if self.componentsValid:
+            return
+        self.components = DisjointSet(len(self))
+        self.cycleEdges = 0
+        self.componentsValid = True
+        for edge in self.connections():
+            self.joinComponents(edge.getFromVertex(), edge.getToVertex())
+
+    def componentCount(self):
+        """Returns the number of connected components, with the edges
+        taken as undirected."""
+        self.updateComponents()
+        return self.components.sizeSets()
+
+    def componentId(self, label):
+        """Returns an id for the connected component of the vertex with
+        label, with the edges taken as undirected. Two vertices are in the
+        same component if they have the same component id. The ids are
+        valid until the graph changes.
+        Precondition: a vertex with label must already be in the graph.
+        Raises: AttibuteError if a vertex with label is not already in the graph."""
+        vertex = self.getVertex(label)
+        self.updateComponents()
+        return self.components.find(vertex.id)
+
+    def cachedProperty(self, key, compute):
+        """Returns the value of a derived property of the graph,
+        calling compute() only if the graph has changed since the
+        value was last cached under key."""
+        if self.cacheVersion != self.version:
+            self.propertyCache.clear()
+            self.cacheVersion = self.version
+        if not key in self.propertyCache:
+            self.propertyCache[key] = compute()
+        return self.propertyCache[key]
+
     # Iterators
     
     def __iter__(self):
@@ -315,11 +591,8 @@ class LinkedDirectedGraph(AbstractCollection):
         return self.getVertices()
 
     def edges(self):
-        """Supports iteration over the edges in the graph."""
-        result = list()
-        for vertex in self.getVertices():
-            result += list(vertex.incidentEdges())
-        return iter(result)
+        """Returns a view of the edges in the graph."""
+        return EdgesView(self)
     
     def getVertices(self):
         """Supports iteration over the vertices in the graph."""
@@ -338,7 +611,99 @@ class LinkedDirectedGraph(AbstractCollection):
         Precondition: a vertex with label must already be in the graph.
         Raises: AttibuteError if a vertex with label is not already in the graph."""
         return self.getVertex(label).neighboringVertices()
-    
+
+    def incomingEdges(self, label):
+        """Supports iteration over the edges directed at the
+        given vertex.
+        Precondition: a vertex with label must already be in the graph.
+        Raises: AttibuteError if a vertex with label is not already in the graph."""
+        return self.getVertex(label).incomingEdges()
+
+    def predecessors(self, label):
+        """Supports iteration over the vertices with an edge directed
+        at the given vertex.
+        Precondition: a vertex with label must already be in the graph.
+        Raises: AttibuteError if a vertex with label is not already in the graph."""
+        return self.getVertex(label).predecessorVertices()
+    
+    # Traversal engine
+
+    def traverse(self, startLabels = None, order = "dfs",
+                 preorder = None, postorder = None, nontree = None):
+        """Visits the vertices reachable from the vertices with startLabels,
+        or from every vertex if startLabels is None, depth-first (order "dfs")
+        or breadth-first (order "bfs"). Uses an explicit stack or queue
+        instead of recursion, so the length of a path is not limited by
+        Python's recursion limit.
+        Each hook is optional:
+            preorder(vertex, parent) when a vertex is first reached, with
+                parent None for a start vertex
+            postorder(vertex) when all of a vertex's edges have been followed
+            nontree(vertex, neighbor) when an edge of vertex leads to a
+                vertex that has already been reached
+        If a hook returns True the traversal stops early and traverse
+        returns True. Otherwise it returns False.
+        Precondition: the start vertices must be in the graph.
+        Raises: AttibuteError if a start vertex is not in the graph."""
+        if startLabels is None:
+            starts = self.getVertices()
+        else:
+            starts = [self.getVertex(label) for label in startLabels]
+        visited = bytearray(len(self))
+        for start in starts:
+            if visited[start.id]:
+                continue
+            visited[start.id] = 1
+            if preorder and preorder(start, None):
+                return True
+            if order == "dfs":
+                stopped = self.depthFirst(start, visited, preorder, postorder, nontree)
+            else:
+                stopped = self.breadthFirst(start, visited, preorder, postorder, nontree)
+            if stopped:
+                return True
+        return False
+
+    def depthFirst(self, start, visited, preorder, postorder, nontree):
+        """The depth-first search of traverse from one start vertex.
+        Each stack frame holds a vertex and an iterator over its
+        neighbors, so the vertices are visited in the same order as
+        by a recursive search."""
+        stack = [(start, iter(start.neighboringVertices()))]
+        while stack:
+            vertex, neighbors = stack[-1]
+            for neighbor in neighbors:
+                if not visited[neighbor.id]:
+                    visited[neighbor.id] = 1
+                    if preorder and preorder(neighbor, vertex):
+                        return True
+                    stack.append((neighbor, iter(neighbor.neighboringVertices())))
+                    break
+                elif nontree and nontree(vertex, neighbor):
+                    return True
+            else:
+                stack.pop()
+                if postorder and postorder(vertex):
+                    return True
+        return False
+
+    def breadthFirst(self, start, visited, preorder, postorder, nontree):
+        """The breadth-first search of traverse from one start vertex."""
+        queue = deque([start])
+        while queue:
+            vertex = queue.popleft()
+            for neighbor in vertex.neighboringVertices():
+                if not visited[neighbor.id]:
+                    visited[neighbor.id] = 1
+                    if preorder and preorder(neighbor, vertex):
+                        return True
+                    queue.append(neighbor)
+                elif nontree and nontree(vertex, neighbor):
+                    return True
+            if postorder and postorder(vertex):
+                return True
+        return False
+
     # Make a table of vertex labels and indicies for a matrix
     def makeLabelTable(self):
         """Returns a table (dictionary) associating vetrex labels with
@@ -366,6 +731,13 @@ class LinkedDirectedGraph(AbstractCollection):
                 weight = self.getEdge(vertexLabel, neighborLabel).getWeight()
                 matrix[vertexIndex][neighborIndex] = weight
         return matrix
+
+    # Snapshot for read-heavy algorithms
+
+    def freeze(self):
+        """Returns an immutable compressed-sparse-row snapshot of the graph.
+        Later changes to the graph are not reflected in the snapshot."""
+        return FrozenGraph(self)
     
     # Method for checking the type of graph
 
@@ -377,12 +749,10 @@ class LinkedDirectedGraph(AbstractCollection):
             True if the grpah is directed or False otherwise (boolean)
             
         The function returns True if the grpah is directed or False otherwise.
+        The count of edges without a mirror edge is kept up to date as
+        edges are added and removed, so this takes constant time.
         """
-        edge_set = set((edge.getFromVertex(), edge.getToVertex()) for edge in self.edges())
-        for from_v, to_v in edge_set:
-            if (to_v, from_v) not in edge_set:
-                return True
-        return False
+        return self.unmatchedEdges > 0
             
     
     def hasCycle(self):
@@ -394,38 +764,31 @@ class LinkedDirectedGraph(AbstractCollection):
             
         The function returns True if the grpah has a cycle or False otherwise.
         Works on undirected graphs with possibly disconnected components.
+        An undirected graph is answered from the union-find components.
         
         """
-        def dfs_findCycle(graph, label, visited, predecessor):
-            """A helper function that performs depth-first search and return False
-                if coming across the same vertex and its predecessor is not the
-                starting vertex.
-            """
-            # mark v as visited
-            visited.add(label)
-            # for each vertex, w, adjacent to v:
-            for neighbor in graph.neighboringVertices(label):
-                neighbor_label = neighbor.getLabel()
-                # if w is unvisited:
-                if neighbor_label not in visited:        
-                    if dfs_findCycle(graph, neighbor_label, visited, label):
-                        return True
-                elif neighbor_label in visited and neighbor_label != predecessor:
-                    return True
-            return False
-        
-        # The grpah might have disconnected components so to avoid redundant work,
-        # visited_vertices should be shared across when looping through each vertex
-        visited_vertices = set()
-        for vertex in self.getVertices():
-            vertex_label = vertex.getLabel()
-            # keep track of predecessor to avoid a false positive for a cycle
-            preceding_vertex = None
-            if vertex_label not in visited_vertices:
-                if(dfs_findCycle(self, vertex_label, visited_vertices, preceding_vertex)):
-                    return True
+        if not self.isDirected():
+            self.updateComponents()
+            return self.cycleEdges > 0
 
-        return False
+        def search():
+            """Searches every component for a cycle."""
+            # keep track of each vertex's predecessor, indexed by vertex id,
+            # to avoid a false positive for a cycle
+            predecessors = [-1] * len(self)
+
+            def treeEdge(vertex, parent):
+                if parent is not None:
+                    predecessors[vertex.id] = parent.id
+
+            def visitedNeighbor(vertex, neighbor):
+                # coming across a visited vertex other than the predecessor
+                return neighbor.id != predecessors[vertex.id]
+
+            return self.traverse(preorder = treeEdge, nontree = visitedNeighbor)
+
+        # The answer is cached until the graph changes
+        return self.cachedProperty("hasCycle", search)
     
     def isConnected(self, start_label):
         """
@@ -435,23 +798,105 @@ class LinkedDirectedGraph(AbstractCollection):
             True if the grpah is connected or False otherwise (boolean)
             
         The function returns True if the grpah is connected or False otherwise.
+        An undirected graph is answered from the union-find components.
         
         """
-        def dfs(graph, label, visited):
-            """A helper function that performs depth-first search"""
-            # mark v as visited
-            visited.add(label)
-            # for each vertex, w, adjacent to v:
-            for neighbor in graph.neighboringVertices(label):
-                neighbor_label = neighbor.getLabel()
-                # if w is unvisited:
-                if neighbor_label not in visited:
-                    dfs(graph, neighbor_label, visited)
-                    
-        visited_vertices = set()
-        dfs(self, start_label, visited_vertices)
-        
-        return len(visited_vertices) == len(list(self.getVertices()))
-       
-        
+        if not self.isDirected():
+            self.getVertex(start_label)
+            return self.componentCount() == 1
 
+        def search():
+            """Counts the vertices reachable from the start vertex."""
+            count = 0
+
+            def visit(vertex, parent):
+                nonlocal count
+                count += 1
+
+            self.traverse([start_label], preorder = visit)
+            return count == len(self)
+
+        return self.cachedProperty(("isConnected", start_label), search)
+
+
+class LinkedUndirectedGraph(LinkedDirectedGraph):
+
+    # An undirected graph stores each connection as a single edge,
+    # shared by the edge indexes of both of its vertices. The
+    # edge's vertex1 and vertex2 are the vertices in the order
+    # they were given to addEdge.
+
+    def isDirected(self):
+        """Returns False, as the graph is undirected."""
+        return False
+
+    def removeVertex(self, label):
+        """Returns True if the vertex was removed, or False otherwise."""
+        removedVertex = self.vertices.pop(label, None)
+        if removedVertex is None:
+            return False
+        for edge in removedVertex.incidentEdges():
+            other = edge.getOtherVertex(removedVertex)
+            if not other is removedVertex:
+                other.edgeIndex.pop(removedVertex.label, None)
+            self.edgeCount -= 1
+        self.releaseVertexId(removedVertex)
+        self.componentsValid = False
+        self.size -= 1
+        self.version += 1
+        return True
+
+    def addEdge(self, fromLabel, toLabel, weight):
+        """Connects the vertices with an edge with the given weight.
+        Preconditions: vertices with fromLabel and toLabel must
+        already be in the graph.
+        The vertices must not already be connected by an edge.
+        Raises: AttibuteError if the vertices
+        are not already in the graph or they are already connected."""
+        fromVertex = self.getVertex(fromLabel)
+        toVertex   = self.getVertex(toLabel)
+        if fromVertex.getEdgeTo(toVertex):
+            raise AttributeError("An edge already connects " + \
+                                 str(fromLabel) + " and " + \
+                                 str(toLabel))
+        fromVertex.connectTo(toVertex, weight)
+        self.joinComponents(fromVertex, toVertex)
+        self.edgeCount += 1
+        self.version += 1
+
+    def removeEdge(self, fromLabel, toLabel):
+        """Returns True if the edge was removed, or False otherwise.
+        Precondition: vertices with fromLabel and toLabel must
+        already be in the graph.
+        Raises: AttibuteError if the vertices
+        are not already in the graph."""
+        fromVertex = self.getVertex(fromLabel)
+        toVertex   = self.getVertex(toLabel)
+        edgeRemovedFlg = fromVertex.disconnectFrom(toVertex)
+        if edgeRemovedFlg:
+            self.componentsValid = False
+            self.edgeCount -= 1
+            self.version += 1
+        return edgeRemovedFlg
+
+    def edges(self):
+        """Returns a view of the edges in the graph, each visited once."""
+        return UndirectedEdgesView(self)
+
+    def connections(self):
+        """Supports iteration over the edges of the graph."""
+        return iter(self.edges())
+
+    def incomingEdges(self, label):
+        """Supports iteration over the edges of the given vertex,
+        which are all both incoming and outgoing.
+        Precondition: a vertex with label must already be in the graph.
+        Raises: AttibuteError if a vertex with label is not already in the graph."""
+        return self.getVertex(label).incidentEdges()
+
+    def predecessors(self, label):
+        """Supports iteration over the neighboring vertices of the
+        given vertex.
+        Precondition: a vertex with label must already be in the graph.
+        Raises: AttibuteError if a vertex with label is not already in the graph."""
+        return self.getVertex(label).neighboringVertices()
@@ -0,0 +1,133 @@
+"""
+File: indexedheap.py
+
+This program implements an IndexedMinHeap class: a d-ary min-heap of
+items with separate priorities, which remembers the position of each
+item so that an item's priority can be decreased in place.
+
+Each item can be in the heap at most once, so a heap used by Dijkstra's
+algorithm never holds more entries than there are vertices.
+"""
+
+class IndexedMinHeap:
+
+    def __init__(self, arity = 4):
+        """Using parallel lists of items and priorities as the underlying
+        data structure, and a dictionary of item/position pairs.
+        Each node has arity children; 4 makes the heap shallower than
+        a binary heap at a small cost per level."""
+        self.arity = arity
+        self.items = []
+        self.priorities = []
+        self.positions = {}
+
+    def isEmpty(self):
+        return len(self.items) == 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(sorted(zip(self.priorities, self.items)))
+
+    def __str__(self):
+        return str(list(zip(self.items, self.priorities)))
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def position(self, item):
+        """Returns the position of item in the heap, or -1 if
+        item is not in the heap."""
+        return self.positions.get(item, -1)
+
+    def getPriority(self, item):
+        """Returns the priority of item.
+        Raises: KeyError if item is not in the heap."""
+        return self.priorities[self.positions[item]]
+
+    def peek(self):
+        """Returns the (item, priority) pair with the smallest priority."""
+        if self.isEmpty():
+            raise IndexError("heap is empty")
+        return self.items[0], self.priorities[0]
+
+    def add(self, item, priority):
+        """Inserts item with the given priority into the heap.
+        Raises: KeyError if item is already in the heap."""
+        if item in self.positions:
+            raise KeyError("item is already in the heap")
+        self.items.append(item)
+        self.priorities.append(priority)
+        self.positions[item] = len(self.items) - 1
+        self.bubble_up(len(self.items) - 1)
+
+    def decreaseKey(self, item, priority):
+        """Lowers the priority of item, which must be in the heap,
+        to priority.
+        Raises: KeyError if item is not in the heap, or ValueError
+        if priority is greater than the item's priority."""
+        i = self.positions[item]
+        if priority > self.priorities[i]:
+            raise ValueError("priority is greater than the item's priority")
+        self.priorities[i] = priority
+        self.bubble_up(i)
+
+    def pop(self):
+        """Removes and returns the (item, priority) pair with the
+        smallest priority."""
+        if self.isEmpty():
+            raise IndexError("heap is empty")
+        item = self.items[0]
+        priority = self.priorities[0]
+        lastItem = self.items.pop()
+        lastPriority = self.priorities.pop()
+        del self.positions[item]
+        if self.items:
+            self.items[0] = lastItem
+            self.priorities[0] = lastPriority
+            self.positions[lastItem] = 0
+            self.bubble_down(0)
+        return item, priority
+
+    def bubble_up(self, i):
+        """Moves the entry at position i up to its place in the heap."""
+        items, priorities, positions = self.items, self.priorities, self.positions
+        item = items[i]
+        priority = priorities[i]
+        while i > 0:
+            parent = (i - 1) // self.arity
+            if not priority < priorities[parent]:
+                break
+            items[i] = items[parent]
+            priorities[i] = priorities[parent]
+            positions[items[i]] = i
+            i = parent
+        items[i] = item
+        priorities[i] = priority
+        positions[item] = i
+
+    def bubble_down(self, i):
+        """Moves the entry at position i down to its place in the heap."""
+        items, priorities, positions = self.items, self.priorities, self.positions
+        arity = self.arity
+        size = len(items)
+        item = items[i]
+        priority = priorities[i]
+        while True:
+            first = arity * i + 1
+            if first >= size:
+                break
+            smallest = first
+            for child in range(first + 1, min(first + arity, size)):
+                if priorities[child] < priorities[smallest]:
+                    smallest = child
+            if not priorities[smallest] < priority:
+                break
+            items[i] = items[smallest]
+            priorities[i] = priorities[smallest]
+            positions[items[i]] = i
+            i = smallest
+        items[i] = item
+        priorities[i] = priority
+        positions[item] = i
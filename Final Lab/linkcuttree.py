@@ -0,0 +1,181 @@
+"""
+File: linkcuttree.py
+
+A LinkCutTree holds a forest of nodes that can be linked and cut, and
+answers which node on the path between two nodes has the largest value,
+in O(log n) amortized time per operation.
+
+Each tree of the forest is split into paths, and each path is kept in a
+splay tree ordered by depth. Every splay node records the node with the
+largest value in its splay subtree, and a reversed flag lets any node be
+made the root of its tree by flipping the path to it. The nodes are
+numbered and their fields are kept in parallel lists; -1 stands for no node.
+"""
+
+class LinkCutTree(object):
+    """Represents a forest of rooted trees with path maximum queries."""
+
+    def __init__(self):
+        """Starts with no nodes."""
+        self.left = []
+        self.right = []
+        self.parent = []
+        self.reversed = bytearray()
+        self.values = []
+        self.best = []
+        self.freeNodes = []
+
+    def addNode(self, value):
+        """Adds a node with value in a tree of its own and returns it."""
+        if self.freeNodes:
+            x = self.freeNodes.pop()
+            self.left[x] = self.right[x] = self.parent[x] = -1
+            self.reversed[x] = 0
+            self.values[x] = value
+            self.best[x] = x
+            return x
+        self.left.append(-1)
+        self.right.append(-1)
+        self.parent.append(-1)
+        self.reversed.append(0)
+        self.values.append(value)
+        self.best.append(len(self.values) - 1)
+        return len(self.values) - 1
+
+    def removeNode(self, x):
+        """Frees node x, which must already be cut from every other node."""
+        self.freeNodes.append(x)
+
+    def getValue(self, x):
+        return self.values[x]
+
+    def setValue(self, x, value):
+        """Changes the value of node x."""
+        self.access(x)
+        self.values[x] = value
+        self.update(x)
+
+    def link(self, x, y):
+        """Joins the trees of x and y with an edge between x and y.
+        Precondition: x and y must be in different trees."""
+        self.makeRoot(x)
+        self.parent[x] = y
+
+    def cut(self, x, y):
+        """Removes the edge between x and y.
+        Precondition: x and y must be joined by an edge."""
+        self.makeRoot(x)
+        self.access(y)
+        # x is now the only node above y on its path
+        self.left[y] = -1
+        self.parent[x] = -1
+        self.update(y)
+
+    def connected(self, x, y):
+        """Returns True if x and y are in the same tree."""
+        return x == y or self.findRoot(x) == self.findRoot(y)
+
+    def pathMax(self, x, y):
+        """Returns the node with the largest value on the path
+        between x and y, which must be in the same tree."""
+        self.makeRoot(x)
+        self.access(y)
+        return self.best[y]
+
+    # Helpers
+
+    def isSplayRoot(self, x):
+        p = self.parent[x]
+        return p == -1 or (self.left[p] != x and self.right[p] != x)
+
+    def push(self, x):
+        """Passes the reversed flag of x down to its children."""
+        if self.reversed[x]:
+            self.reversed[x] = 0
+            left, right = self.left[x], self.right[x]
+            self.left[x], self.right[x] = right, left
+            if left != -1:
+                self.reversed[left] ^= 1
+            if right != -1:
+                self.reversed[right] ^= 1
+
+    def update(self, x):
+        """Recomputes the best node of the splay subtree of x."""
+        best = x
+        values = self.values
+        for child in (self.left[x], self.right[x]):
+            if child != -1 and values[self.best[child]] > values[best]:
+                best = self.best[child]
+        self.best[x] = best
+
+    def rotate(self, x):
+        """Moves x above its parent in the splay tree."""
+        p = self.parent[x]
+        g = self.parent[p]
+        if not self.isSplayRoot(p):
+            if self.left[g] == p:
+                self.left[g] = x
+            else:
+                self.right[g] = x
+        self.parent[x] = g
+        if self.left[p] == x:
+            child = self.right[x]
+            self.left[p] = child
+            self.right[x] = p
+        else:
+            child = self.left[x]
+            self.right[p] = child
+            self.left[x] = p
+        if child != -1:
+            self.parent[child] = p
+        self.parent[p] = x
+        self.update(p)
+        self.update(x)
+
+    def splay(self, x):
+        """Moves x to the root of its splay tree."""
+        # Push the reversed flags down from the splay root first
+        path = [x]
+        while not self.isSplayRoot(path[-1]):
+            path.append(self.parent[path[-1]])
+        for node in reversed(path):
+            self.push(node)
+        while not self.isSplayRoot(x):
+            p = self.parent[x]
+            if not self.isSplayRoot(p):
+                g = self.parent[p]
+                if (self.left[g] == p) == (self.left[p] == x):
+                    self.rotate(p)
+                else:
+                    self.rotate(x)
+            self.rotate(x)
+
+    def access(self, x):
+        """Makes the path from the root of x's tree to x a single splay
+        tree, with x at its root and no node below x on the path."""
+        last = -1
+        y = x
+        while y != -1:
+            self.splay(y)
+            self.right[y] = last
+            self.update(y)
+            last = y
+            y = self.parent[y]
+        self.splay(x)
+
+    def makeRoot(self, x):
+        """Makes x the root of its tree."""
+        self.access(x)
+        self.reversed[x] ^= 1
+        self.push(x)
+
+    def findRoot(self, x):
+        """Returns the root of x's tree."""
+        self.access(x)
+        while True:
+            self.push(x)
+            if self.left[x] == -1:
+                break
+            x = self.left[x]
+        self.splay(x)
+        return x
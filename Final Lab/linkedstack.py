@@ -20,15 +20,14 @@ class LinkedStack(AbstractStack):
     def __iter__(self):
         """Supports iteration over a view of self.
         Visits items from bottom to top of stack."""
-        
-        def visitNodes(node):
-            """Adds items to tempList from tail to head."""
-            if not node is None:
-                visitNodes(node.next)
-                tempList.append(node.data)
-                
-        tempList = list()                
-        visitNodes(self.items)
+        # Collects the items from head to tail without recursion,
+        # so deep stacks do not hit the recursion limit
+        tempList = list()
+        node = self.items
+        while not node is None:
+            tempList.append(node.data)
+            node = node.next
+        tempList.reverse()
         return iter(tempList)
 
     def peek(self):
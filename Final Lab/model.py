@@ -4,24 +4,50 @@ The model for testing graph-processing algorithms.
 
 The programs modify the run() method to perform input validation for the grpah
 before running the algorithm on it.
+
+The model keeps a bounded least-recently-used cache of shortest-path trees,
+keyed by the graph's version and the start label, so repeated requests for
+the shortest paths of an unchanged network are served from memory.
 """
 
-from graph import LinkedDirectedGraph
+from collections import OrderedDict
+from graph import LinkedDirectedGraph, LinkedUndirectedGraph
+from algorithm import shortestPaths
 
 class GraphDemoModel(object):
     """The model class for the application."""
     
-    def __init__(self):
+    def __init__(self, cacheCapacity = 16):
+        """cacheCapacity is the number of shortest-path trees to keep."""
         self.graph = None
         self.startLabel = None
+        self.negativeWeights = False
+        self.cacheCapacity = cacheCapacity
+        self.pathCache = OrderedDict()
+        self.cacheHits = 0
+        self.cacheMisses = 0
 
-    def createGraph(self, rep, startLabel):
+    def createGraph(self, rep, startLabel, foldMirrored = False, negativeWeights = False):
         """Creates a graph from rep and startLabel.
         Returns a message if the graph was successfully
-        created or an error message otherwise."""
-        self.graph = LinkedDirectedGraph()
+        created or an error message otherwise.
+        If foldMirrored is True, the graph is a LinkedUndirectedGraph
+        and each mirrored pair A>B;w B>A;w becomes a single edge; an
+        edge without its mirror is an error, as it would otherwise be
+        followed in both directions.
+        If negativeWeights is True, weights such as -3 are read as
+        numbers; run() then only allows johnsonAllPairs."""
+        if foldMirrored:
+            self.graph = LinkedUndirectedGraph()
+        else:
+            self.graph = LinkedDirectedGraph()
+        # The new graph's versions start again from 0
+        self.pathCache.clear()
         self.startLabel = startLabel
+        self.negativeWeights = False
         edgeList = rep.split()
+        # The weights of the edges still waiting for their mirrors
+        unpaired = dict()
 
         for edge in edgeList:
             if '>' not in edge:
@@ -45,16 +71,31 @@ class GraphDemoModel(object):
 
                 if weight.isdigit():
                     weight = int(weight)
+                elif negativeWeights and weight[:1] == "-" and weight[1:].isdigit():
+                    weight = int(weight)
+                    self.negativeWeights = True
 
                 if not self.graph.containsVertex(fromLabel):
                     self.graph.addVertex(fromLabel)
                 if not self.graph.containsVertex(toLabel):
                     self.graph.addVertex(toLabel)
                 if self.graph.containsEdge(fromLabel, toLabel):
+                    if foldMirrored and (toLabel, fromLabel) in unpaired:
+                        # The mirror of an edge that is already in the graph
+                        if unpaired.pop((toLabel, fromLabel)) == weight:
+                            continue
+                        self.graph = None
+                        return "Mirrored edges with different weights"
                     self.graph = None
                     return "Duplicate edge"
 
                 self.graph.addEdge(fromLabel, toLabel, weight)
+                if foldMirrored and fromLabel != toLabel:
+                    unpaired[(fromLabel, toLabel)] = weight
+
+        if unpaired:
+            self.graph = None
+            return "Edge without a mirror"
 
         vertex = self.graph.getVertex(startLabel)
         if vertex is None:
@@ -84,15 +125,65 @@ class GraphDemoModel(object):
         """
         if self.graph is None:
             return None
+
+        # Only Johnson's algorithm is meant for negative weights
+        if self.negativeWeights and algorithm.__name__ != "johnsonAllPairs":
+            raise ValueError("Invalid graph! The weights must not be negative")
         
-        # Input validation for the graph
+        # Input validation for the graph. isDirected() is constant time, and
+        # the graph caches hasCycle() and isConnected() until it changes, so
+        # repeated runs on an unchanged network skip the traversals.
         if algorithm.__name__  == "topoSort": # must be a DAG
             if not self.graph.isDirected() or self.graph.hasCycle():
                 raise ValueError("Invalid graph! The graph must be a DAG")
+        elif algorithm.__name__  == "topoLayers": # finds any cycle itself, so only directed
+            if not self.graph.isDirected():
+                raise ValueError("Invalid graph! The graph must be a DAG")
         elif algorithm.__name__  == "spanTree": # must be undirected connected graph and are weighted
             if not self.graph.isConnected(self.startLabel) or self.graph.isDirected():
                 raise ValueError("Invalid graph! The graph must be undirected connected")
+        elif algorithm.__name__ in ("spanForest", "bestSpanTree"): # spans each component, so only undirected
+            if self.graph.isDirected():
+                raise ValueError("Invalid graph! The graph must be undirected")
+        elif algorithm is shortestPaths:
+            return self.getShortestPaths(self.startLabel)
         return algorithm(self.graph, self.startLabel)
+
+    def getShortestPaths(self, startLabel):
+        """Returns shortestPaths(graph, startLabel), from the cache if the
+        graph has not changed since it was computed, or None if the graph
+        is unavailable. The result is shared with the cache, so callers
+        must not modify it."""
+        if self.graph is None:
+            return None
+        if self.negativeWeights:
+            raise ValueError("Invalid graph! The weights must not be negative")
+        key = (self.graph.version, startLabel)
+        if key in self.pathCache:
+            self.cacheHits += 1
+            self.pathCache.move_to_end(key)
+            return self.pathCache[key]
+
+        self.cacheMisses += 1
+        # Any change to the graph makes every cached tree stale
+        for cachedKey in list(self.pathCache):
+            if cachedKey[0] != self.graph.version:
+                del self.pathCache[cachedKey]
+        result = shortestPaths(self.graph, startLabel)
+        if self.cacheCapacity > 0:
+            self.pathCache[key] = result
+            if len(self.pathCache) > self.cacheCapacity:
+                # Evict the least recently used tree
+                self.pathCache.popitem(last = False)
+        return result
+
+    def getCacheStats(self):
+        """Returns a dictionary with the hits, misses, size and capacity
+        of the shortest-path cache."""
+        return {"hits": self.cacheHits,
+                "misses": self.cacheMisses,
+                "size": len(self.pathCache),
+                "capacity": self.cacheCapacity}
         
 if __name__ == "__main__":
     testModel = GraphDemoModel()
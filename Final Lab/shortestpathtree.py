@@ -0,0 +1,58 @@
+"""
+File: shortestpathtree.py
+
+A ShortestPathTree is a read-only mapping with the same contents as the
+result of shortestPaths: each reachable vertex's label maps to
+{"edge": ..., "cost": ...}.
+
+It keeps only three compact arrays, as returned by a Dijkstra search over
+a FrozenGraph: the ids of the reached vertices, their costs and the slots
+of the edges that reach them. An entry is built only when it is asked
+for, so a tree that is passed along, or only partly read, costs no more
+than its arrays.
+"""
+
+from collections.abc import Mapping
+
+class ShortestPathTree(Mapping):
+    """Represents the shortest paths from one start vertex."""
+
+    def __init__(self, graph, reached, costs, slots):
+        """graph is the FrozenGraph that was searched; reached, costs and
+        slots are parallel sequences by position of reached vertex."""
+        self.graph = graph
+        self.reached = reached
+        self.costs = costs
+        self.slots = slots
+        # The position of each reached vertex, by id, built on first lookup
+        self.positions = None
+
+    def __len__(self):
+        """Returns the number of reached vertices."""
+        return len(self.reached)
+
+    def __iter__(self):
+        """Supports iteration over the labels of the reached vertices,
+        in the order they were first reached."""
+        labels = self.graph.labels
+        return (labels[v] for v in self.reached)
+
+    def __getitem__(self, label):
+        """Returns {"edge": ..., "cost": ...} for the vertex with label.
+        Raises: KeyError if the vertex was not reached."""
+        if self.positions is None:
+            self.positions = {v: position for position, v in enumerate(self.reached)}
+        position = self.positions.get(self.graph.ids.get(label))
+        if position is None:
+            raise KeyError(label)
+        return {
+            "edge": self.graph.edges[self.slots[position]],
+            "cost": self.costs[position]
+        }
+
+    def items(self):
+        """Supports iteration over the (label, entry) pairs, in the
+        order the vertices were first reached, without any lookups."""
+        labels, edges = self.graph.labels, self.graph.edges
+        return ((labels[v], {"edge": edges[slot], "cost": cost})
+                for v, cost, slot in zip(self.reached, self.costs, self.slots))
@@ -3,7 +3,10 @@ Test Driver for Smart City Utility Network Optimizer
 """
 
 from model import GraphDemoModel
-from algorithm import spanTree, repairQueue, shortestPaths
+from contractionhierarchy import ContractionHierarchy
+from dynamicspantree import DynamicSpanTree
+from dynamicshortestpaths import DynamicShortestPaths
+from algorithm import spanTree, spanForest, repairQueue, shortestPaths, shortestPath, bidirectionalShortestPath, johnsonAllPairs
 
 def display_repair_queue(queue):
     for item in queue:
@@ -66,8 +69,157 @@ def case_3_shortest_paths():
     for vertex, info in result.items():
         print(f"To {vertex}: via {info['edge']}, cost = {info['cost']}")
 
+def case_4_undirected_network():
+    print("\n===== Case 4: Undirected Network (Mirrored Edges Folded) =====")
+    model = GraphDemoModel()
+
+    # Each mirrored pair, e.g. A>B;5 B>A;5, is stored as a single undirected edge
+    graph_input = "A>B;5 B>A;5 B>C;4 C>B;4 A>C;6 C>A;6 C>D;3 D>C;3"
+    start_vertex = "A"
+
+    msg = model.createGraph(graph_input, start_vertex, foldMirrored = True)
+    print("Graph creation:", msg)
+    print("Original Graph:\n", model.getGraph())
+    print("Is the graph directed?", model.graph.isDirected())
+
+    print("\nMST Result (undirected edges):")
+    for edge in model.run(spanTree):
+        print(edge)
+
+    result = model.run(shortestPaths)
+    print(f'\nShortest Paths from {start_vertex}:')
+    for vertex, info in result.items():
+        print(f"To {vertex}: via {info['edge']}, cost = {info['cost']}")
+
+    # A one-way edge or a repeated self-loop cannot be folded
+    print("\nOne-way edge:", model.createGraph("A>B;5 B>C;1 C>B;1", "C", foldMirrored = True))
+    print("Repeated self-loop:", model.createGraph("A>A;1 A>A;1", "A", foldMirrored = True))
+
+def case_5_route():
+    print("\n===== Case 5: Route Between Two Sites =====")
+    model = GraphDemoModel()
+
+    # Same network as case 3; the search stops once the destination is settled
+    graph_input = "A>B;2 B>A;2 A>D;7 D>A;7 B>C;3 C>B;3 B>D;4 D>B;4 C>F;1 F>C;1 D>E;2 E>D;2 D>F;1 F>D;1 E>F;5 F>E;5"
+    msg = model.createGraph(graph_input, "A")
+    print("Graph creation:", msg)
+
+    route = shortestPath(model.graph, "A", "E")
+    print("\nRoute from A to E, cost =", route["cost"])
+    for edge in route["path"]:
+        print(edge)
+
+    route = bidirectionalShortestPath(model.graph, "A", "E")
+    print("\nBidirectional route from A to E, cost =", route["cost"])
+    for edge in route["path"]:
+        print(edge)
+
+def case_6_negative_weights():
+    print("\n===== Case 6: All Pairs With Negative Weights =====")
+    model = GraphDemoModel()
+
+    # A DAG whose negative weights are rebates; it has no negative cycle
+    graph_input = "C>A;-3 C>B;-4 B>A;-2"
+    msg = model.createGraph(graph_input, "C", negativeWeights = True)
+    print("Graph creation:", msg)
+    print("Original Graph:\n", model.getGraph())
+
+    print("\nCosts between all pairs:")
+    for vertex, row in model.run(johnsonAllPairs):
+        print(f"From {vertex}:", ", ".join(f"{other} = {cost}" for other, cost in row.items()))
+
+    # Dijkstra's algorithm is not meant for negative weights
+    try:
+        model.run(shortestPaths)
+    except ValueError as e:
+        print("\nShortest Paths Error:", e)
+
+def case_7_contraction_hierarchy():
+    print("\n===== Case 7: Contraction Hierarchy Queries =====")
+    model = GraphDemoModel()
+
+    # Same network as case 3, with a one-way edge added
+    graph_input = "A>B;2 B>A;2 A>D;7 D>A;7 B>C;3 C>B;3 B>D;4 D>B;4 C>F;1 F>C;1 D>E;2 E>D;2 D>F;1 F>D;1 E>F;5 F>E;5 G>A;1"
+    msg = model.createGraph(graph_input, "A")
+    print("Graph creation:", msg)
+
+    hierarchy = ContractionHierarchy(model.graph)
+    print("Shortcuts added:", hierarchy.sizeShortcuts())
+    print("Route from A to E:", hierarchy.path("A", "E"), "cost =", hierarchy.cost("A", "E"))
+    print("Route from A to G:", hierarchy.path("A", "G"))
+
+    # Every query must cost the same as Dijkstra's algorithm
+    labels = [vertex.getLabel() for vertex in model.graph.getVertices()]
+    matches = True
+    for source in labels:
+        costs = shortestPaths(model.graph, source)
+        for target in labels:
+            expected = 0 if source == target else costs.get(target, {}).get("cost")
+            if hierarchy.cost(source, target) != expected:
+                matches = False
+    print("All hierarchy costs match shortestPaths:", matches)
+
+    model.graph.setEdgeWeight("D", "E", 9)
+    print("Hierarchy current after a change?", hierarchy.isCurrent(model.graph))
+
+def case_8_dynamic_span_tree():
+    print("\n===== Case 8: Layout Kept Up To Date As The Network Changes =====")
+    model = GraphDemoModel()
+
+    # Same network as case 1, folded into undirected edges
+    graph_input = "A>B;5 B>A;5 B>C;4 C>B;4 A>C;6 C>A;6 C>D;3 D>C;3"
+    msg = model.createGraph(graph_input, "A", foldMirrored = True)
+    print("Graph creation:", msg)
+
+    tree = DynamicSpanTree(model.graph)
+    changes = [
+        ("Add B-D;1", lambda: tree.addEdge("B", "D", 1)),
+        ("Raise C-D to 10", lambda: tree.setEdgeWeight("C", "D", 10)),
+        ("Remove B-C", lambda: tree.removeEdge("B", "C")),
+        ("Add E and D-E;2", lambda: (tree.addVertex("E"), tree.addEdge("D", "E", 2))),
+        # A change made to an edge directly, not through the tree
+        ("Raise A-B to 20 directly", lambda: model.graph.getEdge("A", "B").setWeight(20)),
+        ("Remove A", lambda: tree.removeVertex("A")),
+    ]
+    print("Start: weight =", tree.totalWeight())
+    for description, change in changes:
+        change()
+        expected = sum(edge.getWeight() for edge in spanForest(model.graph))
+        print(f"{description}: weight = {tree.totalWeight()}, matches spanForest: {tree.totalWeight() == expected}")
+
+def case_9_dynamic_shortest_paths():
+    print("\n===== Case 9: Shortest Paths Kept Up To Date As Traffic Changes =====")
+    model = GraphDemoModel()
+
+    # Same network as case 3
+    graph_input = "A>B;2 B>A;2 A>D;7 D>A;7 B>C;3 C>B;3 B>D;4 D>B;4 C>F;1 F>C;1 D>E;2 E>D;2 D>F;1 F>D;1 E>F;5 F>E;5"
+    msg = model.createGraph(graph_input, "A")
+    print("Graph creation:", msg)
+
+    paths = DynamicShortestPaths(model.graph, "A")
+    changes = [
+        ("Raise B>D to 9", lambda: paths.setEdgeWeight("B", "D", 9)),
+        ("Add A>E;3", lambda: paths.addEdge("A", "E", 3)),
+        ("Remove C>F", lambda: paths.removeEdge("C", "F")),
+        # A traffic feed changing the graph directly, not through paths
+        ("Raise A>E to 8 directly", lambda: model.graph.setEdgeWeight("A", "E", 8)),
+        ("Remove D", lambda: paths.removeVertex("D")),
+    ]
+    for description, change in changes:
+        changed = change()
+        costs = {label: info["cost"] for label, info in paths.paths().items()}
+        expected = {label: info["cost"] for label, info in shortestPaths(model.graph, "A").items()}
+        print(f"{description}: changed {sorted(changed) if changed else '-'}, "
+              f"costs {sorted(costs.items())}, matches shortestPaths: {costs == expected}")
+
 
 if __name__ == "__main__":
     case_1_mst()
     case_2_repair_queue()
     case_3_shortest_paths()
+    case_4_undirected_network()
+    case_5_route()
+    case_6_negative_weights()
+    case_7_contraction_hierarchy()
+    case_8_dynamic_span_tree()
+    case_9_dynamic_shortest_paths()
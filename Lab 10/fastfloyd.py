@@ -0,0 +1,265 @@
+"""
+File: fastfloyd.py
+
+Defines a vectorized version of the all pairs shortest paths algorithm of
+Floyd, using NumPy.
+
+The distance matrix from makeDistanceMatrix is copied into a float64 NumPy
+array in which infinity is the number inf rather than the string "-", so
+no cell needs the isLessWithInfinity and addWithInfinity tests. For each
+intermediate vertex k, every cell is updated at once: the column of
+distances to k plus the row of distances from k gives the distances
+through k, and the matrix keeps the smaller of each pair. The result is
+copied back into the Grid, with "-" for infinity, for printDistanceMatrix.
+
+To find the routes as well as their costs, an int32 matrix of next hops
+records, for each pair, the vertex that follows the first on the shortest
+path between them. It is updated wherever a distance improves, and
+reconstructPath follows it in time proportional to the path's length.
+
+For large matrices, blockedFloydWarshall splits the matrix into square
+tiles and works through one row and column of tiles at a time, so each
+step touches tiles that fit in the cache. The tiles within each phase of a
+step are independent, so they are shared out among a pool of worker
+processes. The matrix can be a numpy.memmap (see toMemmap), which the
+workers open themselves, so it may be larger than memory; any other array
+is copied into shared memory for the workers.
+
+Usage: python fastfloyd.py [number of vertices, default 2000] [tile size]
+"""
+
+import os
+import sys
+import time
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from graph import LinkedDirectedGraph
+from grid import Grid
+
+def toArray(matrix):
+    """Returns a float64 array with the distances in the Grid matrix,
+    with inf for LinkedDirectedGraph.INFINITY."""
+    infinity = LinkedDirectedGraph.INFINITY
+    rows = [[np.inf if value == infinity else value for value in matrix[row]]
+            for row in range(matrix.getHeight())]
+    return np.array(rows, dtype = np.float64).reshape(len(rows), len(rows))
+
+def toGrid(distances, integral = True, matrix = None):
+    """Copies the distances into matrix, or into a new Grid if matrix is
+    None, with LinkedDirectedGraph.INFINITY for inf, and returns it.
+    If integral is True, the distances are stored as ints."""
+    n = distances.shape[0]
+    if matrix is None:
+        matrix = Grid(n, n, LinkedDirectedGraph.INFINITY)
+    values = distances.tolist()
+    for row in range(n):
+        for column in range(n):
+            value = values[row][column]
+            if value == np.inf:
+                matrix[row][column] = LinkedDirectedGraph.INFINITY
+            elif integral:
+                matrix[row][column] = int(value)
+            else:
+                matrix[row][column] = value
+    return matrix
+
+def floydWarshall(distances, nextHops = None):
+    """Replaces the distances in the square array distances by the
+    distances of the shortest paths, and returns it.
+    If nextHops (see makeNextHops) is given, it is updated along with
+    the distances, for reconstructPath."""
+    n = distances.shape[0]
+    for k in range(n):
+        # Row k and column k do not change in step k, as long as the
+        # graph has no negative cycle
+        throughK = distances[:, k, np.newaxis] + distances[np.newaxis, k, :]
+        if nextHops is None:
+            np.minimum(distances, throughK, out = distances)
+        else:
+            # A path that is shorter through k starts the same way
+            # as the path to k
+            shorter = throughK < distances
+            np.copyto(distances, throughK, where = shorter)
+            np.copyto(nextHops, nextHops[:, k, np.newaxis], where = shorter)
+    return distances
+
+def makeNextHops(distances):
+    """Returns an int32 array of next hops for the square array of
+    distances, before floydWarshall: cell [i, j] holds j if there is an
+    edge from i to j, i if i == j, and -1 otherwise. After floydWarshall,
+    cell [i, j] holds the vertex that follows i on the shortest path
+    from i to j, or -1 if there is no path."""
+    n = distances.shape[0]
+    columns = np.arange(n, dtype = np.int32)
+    return np.where(np.isfinite(distances), columns[np.newaxis, :], -1).astype(np.int32)
+
+def reconstructPath(nextHops, i, j):
+    """Returns the list of index positions of the vertices on the shortest
+    path from i to j, by following the next hops, or None if there is no
+    path. Precondition: the graph has no negative cycle."""
+    if nextHops[i, j] < 0:
+        return None
+    path = [i]
+    while i != j:
+        i = int(nextHops[i, j])
+        path.append(i)
+    return path
+
+def allPairsShortestPathsFast(matrix, paths = False):
+    """Works like allPairsShortestPaths: modifies the distance matrix
+    (a Grid) to contain the shortest paths between any vertices that are
+    connected by paths.
+    If paths is True, returns the array of next hops for reconstructPath."""
+    integral = all(isinstance(value, int) or value == LinkedDirectedGraph.INFINITY
+                   for row in range(matrix.getHeight()) for value in matrix[row])
+    distances = toArray(matrix)
+    nextHops = makeNextHops(distances) if paths else None
+    floydWarshall(distances, nextHops)
+    toGrid(distances, integral, matrix)
+    return nextHops
+
+def toMemmap(graph, table, path):
+    """Returns a numpy.memmap of float64 distances, stored in the file at
+    path, for the given graph and its label table, like
+    makeDistanceMatrix. The matrix is filled a row at a time, so it never
+    has to fit in memory as a Grid."""
+    n = len(table)
+    distances = np.memmap(path, dtype = np.float64, mode = "w+", shape = (n, n))
+    row = np.empty(n)
+    for vertex in graph.getVertices():
+        vertexLabel = vertex.getLabel()
+        vertexIndex = table[vertexLabel]
+        row.fill(np.inf)
+        row[vertexIndex] = 0
+        for edge in vertex.incidentEdges():
+            row[table[edge.getToVertex().getLabel()]] = edge.getWeight()
+        distances[vertexIndex] = row
+    distances.flush()
+    return distances
+
+def blockedFloydWarshall(distances, tileSize = 256, workers = None):
+    """Replaces the distances in the square array distances by the
+    distances of the shortest paths, tile by tile, and returns it.
+    workers defaults to the number of CPUs; with one worker the tiles
+    are processed in this process."""
+    n = distances.shape[0]
+    tiles = (n + tileSize - 1) // tileSize
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or tiles <= 1:
+        for k in range(tiles):
+            relaxTile(distances, k, k, k, tileSize)
+            for other in range(tiles):
+                if other != k:
+                    relaxTile(distances, k, other, k, tileSize)
+                    relaxTile(distances, other, k, k, tileSize)
+            for row in range(tiles):
+                if row != k:
+                    relaxTileRow(distances, row, k, tileSize)
+        return distances
+
+    block = None
+    if isinstance(distances, np.memmap) and distances.filename is not None:
+        distances.flush()
+        source = ("file", distances.filename, distances.offset)
+        matrix = distances
+    else:
+        block = shared_memory.SharedMemory(create = True, size = max(1, distances.nbytes))
+        source = ("memory", block.name, 0)
+        matrix = np.ndarray((n, n), dtype = np.float64, buffer = block.buf)
+        matrix[:] = distances
+    try:
+        with ProcessPoolExecutor(max_workers = workers,
+                                 initializer = attachMatrix,
+                                 initargs = (source, n)) as executor:
+            for k in range(tiles):
+                # Phase 1: the tile on the diagonal depends only on itself
+                relaxTile(matrix, k, k, k, tileSize)
+                # Phase 2: the other tiles in row k and column k
+                others = [other for other in range(tiles) if other != k]
+                tasks = [(k, other, k, tileSize) for other in others] + \
+                        [(other, k, k, tileSize) for other in others]
+                list(executor.map(relaxSharedTile, tasks))
+                # Phase 3: the remaining tiles, a row of tiles per task
+                tasks = [(row, k, tileSize) for row in others]
+                list(executor.map(relaxSharedTileRow, tasks))
+        if block is None:
+            distances.flush()
+        else:
+            distances[:] = matrix
+    finally:
+        if block is not None:
+            del matrix
+            block.close()
+            block.unlink()
+    return distances
+
+def relaxTile(distances, row, column, k, tileSize):
+    """Updates the tile at (row, column) with the paths through the
+    vertices of tile k. If the tile is in row k or column k, the
+    distances it uses from that row or column are its own."""
+    n = distances.shape[0]
+    rows = slice(row * tileSize, min(n, (row + 1) * tileSize))
+    columns = slice(column * tileSize, min(n, (column + 1) * tileSize))
+    through = slice(k * tileSize, min(n, (k + 1) * tileSize))
+    tile = np.array(distances[rows, columns])
+    left = tile if column == k else np.array(distances[rows, through])
+    top = tile if row == k else np.array(distances[through, columns])
+    for step in range(through.stop - through.start):
+        np.minimum(tile, left[:, step, np.newaxis] + top[np.newaxis, step, :], out = tile)
+    distances[rows, columns] = tile
+
+def relaxTileRow(distances, row, k, tileSize):
+    """Updates the tiles of row, other than the tile in column k,
+    with the paths through the vertices of tile k."""
+    tiles = (distances.shape[0] + tileSize - 1) // tileSize
+    for column in range(tiles):
+        if column != k:
+            relaxTile(distances, row, column, k, tileSize)
+
+# The matrix of blockedFloydWarshall, attached once in each worker process
+sharedMatrix = None
+
+def attachMatrix(source, n):
+    """Opens the matrix in a worker process, from its file or its
+    shared memory block."""
+    global sharedMatrix
+    kind, name, offset = source
+    if kind == "file":
+        sharedMatrix = (None, np.memmap(name, dtype = np.float64, mode = "r+",
+                                        offset = offset, shape = (n, n)))
+    else:
+        block = shared_memory.SharedMemory(name = name)
+        sharedMatrix = (block, np.ndarray((n, n), dtype = np.float64, buffer = block.buf))
+
+def relaxSharedTile(task):
+    """Runs relaxTile on the worker's matrix."""
+    row, column, k, tileSize = task
+    relaxTile(sharedMatrix[1], row, column, k, tileSize)
+
+def relaxSharedTileRow(task):
+    """Runs relaxTileRow on the worker's matrix."""
+    row, k, tileSize = task
+    relaxTileRow(sharedMatrix[1], row, k, tileSize)
+
+def main():
+    """Times the algorithm on a random graph."""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    graph = LinkedDirectedGraph(range(n))
+    for fromLabel in range(n):
+        for toLabel in random.sample(range(n), min(n, 10)):
+            if fromLabel != toLabel:
+                graph.addEdge(fromLabel, toLabel, random.randint(1, 100))
+    table = graph.makeLabelTable()
+    matrix = graph.makeDistanceMatrix(table)
+    start = time.time()
+    if len(sys.argv) > 2:
+        blockedFloydWarshall(toArray(matrix), int(sys.argv[2]))
+    else:
+        allPairsShortestPathsFast(matrix)
+    print("%d vertices: %.2f seconds" % (n, time.time() - start))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+File: testfastfloyd.py
+
+Tests the versions of Floyd's algorithm in fastfloyd.py against
+allPairsShortestPaths from testdirected.py, on a graph of random edges
+whose matrix splits into tiles of uneven sizes. The routes rebuilt from
+the next hops are checked against the graph's edges.
+"""
+
+import os
+import random
+import tempfile
+from graph import LinkedDirectedGraph
+from testdirected import allPairsShortestPaths, printDistanceMatrix
+from fastfloyd import toArray, toGrid, blockedFloydWarshall, toMemmap, \
+     allPairsShortestPathsFast, reconstructPath
+
+def makeGraph():
+    """Returns a graph of 13 vertices with random edges, the same on
+    every run, and its label table."""
+    rand = random.Random(7)
+    labels = list("ABCDEFGHIJKLM")
+    graph = LinkedDirectedGraph(labels)
+    for fromLabel in labels:
+        for toLabel in rand.sample(labels, 3):
+            if fromLabel != toLabel:
+                graph.addEdge(fromLabel, toLabel, rand.randint(1, 20))
+    return graph, graph.makeLabelTable()
+
+def sameMatrix(first, second):
+    """Returns True if the two Grids hold the same distances."""
+    return all(first[row][column] == second[row][column]
+               for row in range(first.getHeight())
+               for column in range(first.getWidth()))
+
+def pathCost(graph, labels, path):
+    """Returns the total weight of the edges along path, a list of index
+    positions, or None if two of its vertices are not joined by an edge."""
+    cost = 0
+    for i, j in zip(path, path[1:]):
+        edge = graph.getEdge(labels[i], labels[j])
+        if edge is None:
+            return None
+        cost += edge.getWeight()
+    return cost
+
+def main():
+    graph, table = makeGraph()
+    expected = graph.makeDistanceMatrix(table)
+    allPairsShortestPaths(expected)
+    print("\nThe distances found by allPairsShortestPaths:")
+    printDistanceMatrix(expected, table)
+
+    print("\nBlocked Floyd-Warshall, tiles of 4 vertices:")
+    distances = blockedFloydWarshall(toArray(graph.makeDistanceMatrix(table)), 4, workers = 1)
+    print("In this process, matches:", sameMatrix(toGrid(distances), expected))
+    distances = blockedFloydWarshall(toArray(graph.makeDistanceMatrix(table)), 4, workers = 2)
+    print("Two workers in shared memory, matches:", sameMatrix(toGrid(distances), expected))
+    with tempfile.TemporaryDirectory() as directory:
+        distances = toMemmap(graph, table, os.path.join(directory, "distances.dat"))
+        blockedFloydWarshall(distances, 4, workers = 2)
+        print("Two workers on a memmap, matches:", sameMatrix(toGrid(distances), expected))
+        del distances
+
+    print("\nVectorized Floyd-Warshall with next hops:")
+    matrix = graph.makeDistanceMatrix(table)
+    nextHops = allPairsShortestPathsFast(matrix, paths = True)
+    print("Distances match:", sameMatrix(matrix, expected))
+    labels = sorted(table, key = lambda label: table[label])
+    path = reconstructPath(nextHops, table["A"], table["M"])
+    print("Route from A to M:", [labels[i] for i in path],
+          "cost =", pathCost(graph, labels, path))
+    # Each route must follow edges of the graph, from its first vertex to
+    # its last, and cost what allPairsShortestPaths found
+    matches = True
+    for i in range(len(labels)):
+        for j in range(len(labels)):
+            path = reconstructPath(nextHops, i, j)
+            if path is None:
+                matches = matches and expected[i][j] == LinkedDirectedGraph.INFINITY
+            else:
+                matches = matches and path[0] == i and path[-1] == j and \
+                          pathCost(graph, labels, path) == expected[i][j]
+    print("All routes match allPairsShortestPaths:", matches)
+
+if __name__ == "__main__":
+    main()